@@ -0,0 +1 @@
+"""Benchmarks of the data loaders and figure builders, see benchmarks/run.py."""
@@ -0,0 +1,145 @@
+"""Import-time profile of the dashboard.
+
+Runs `python -X importtime` in fresh interpreters and reports
+  - startup: the module-level imports of app.py, per package and the
+    slowest modules, and
+  - per card: what the first call of each lazy entry point in plots/
+    imports on top of the startup (folium, altair, plotly.express, ...).
+
+Package times are self times (excluding child imports) summed over all
+modules of the package; the slowest modules are listed with cumulative times.
+
+Run from the repository root:
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --top 25 --repeats 5
+    python -m benchmarks.importtime --json logs/importtime.json
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from plots import _ENTRY_POINTS
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+def startup_modules(app_path=APP_PATH):
+    """Modules app.py imports at module level, in source order."""
+    modules = []
+    for node in ast.parse(Path(app_path).read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from the -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def profile(modules, repeats=3):
+    """Import `modules` in `repeats` fresh interpreters, median self time per imported module."""
+    code = "\n".join(f"import {module}" for module in modules)
+    runs = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=APP_PATH.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(parse_importtime(result.stderr))
+
+    names = set.intersection(*(set(run) for run in runs))
+    return {
+        name: {
+            "self_us": statistics.median(run[name][0] for run in runs),
+            "cumulative_us": statistics.median(run[name][1] for run in runs),
+        }
+        for name in names
+    }
+
+
+def by_package(modules):
+    """Summed self time per top-level package, largest first."""
+    packages = {}
+    for name, entry in modules.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + entry["self_us"]
+    return dict(sorted(packages.items(), key=lambda item: -item[1]))
+
+
+def build_report(repeats=3, top=15):
+    startup = profile(startup_modules(), repeats)
+    report = {
+        "startup": {
+            "total_ms": round(sum(entry["self_us"] for entry in startup.values()) / 1000, 1),
+            "packages_ms": {name: round(us / 1000, 1) for name, us in list(by_package(startup).items())[:top]},
+            "slowest_ms": {
+                name: round(entry["cumulative_us"] / 1000, 1)
+                for name, entry in sorted(startup.items(), key=lambda item: -item[1]["cumulative_us"])[:top]
+            },
+        },
+        "cards": {},
+    }
+
+    # pro Modul nur einmal messen, mehrere Entry Points teilen sich ein Modul
+    card_modules = {}
+    for name, module in _ENTRY_POINTS.items():
+        card_modules.setdefault(module, []).append(name)
+    for module, names in card_modules.items():
+        loaded = profile(startup_modules() + [module], repeats)
+        deferred = {name: entry for name, entry in loaded.items() if name not in startup}
+        report["cards"][module] = {
+            "entry_points": names,
+            "deferred_ms": round(sum(entry["self_us"] for entry in deferred.values()) / 1000, 1),
+            "packages_ms": {name: round(us / 1000, 1) for name, us in list(by_package(deferred).items())[:top]},
+        }
+    return report
+
+
+def print_report(report):
+    startup = report["startup"]
+    print(f"Startup (module-level imports of app.py): {startup['total_ms']:.1f} ms")
+    for name, ms in startup["packages_ms"].items():
+        print(f"  {name:<28} {ms:>8.1f} ms")
+    print("\nSlowest modules (cumulative):")
+    for name, ms in startup["slowest_ms"].items():
+        print(f"  {name:<40} {ms:>8.1f} ms")
+
+    print("\nDeferred until the first render of a card:")
+    for module, card in sorted(report["cards"].items(), key=lambda item: -item[1]["deferred_ms"]):
+        packages = ", ".join(f"{name} {ms:.0f}" for name, ms in card["packages_ms"].items() if ms >= 1)
+        print(f"  {module:<32} {card['deferred_ms']:>8.1f} ms  {packages}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="modules / packages listed per section")
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.repeats, args.top)
+    print_report(report)
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
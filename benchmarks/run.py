@@ -0,0 +1,273 @@
+"""Benchmarks of the loaders and figure builders on synthetic data.
+
+Every case runs headless (no Streamlit server) on inputs scaled from 1x to
+1000x the current row counts and reports the median wall time of cold runs
+(all caches cleared), the peak memory allocated through Python (tracemalloc,
+buffers allocated inside pyarrow are not included) and the size of the output
+(JSON / HTML payload, or the in-memory size of a loaded frame).
+
+Results can be stored as baselines; later runs flag every metric that grew by
+more than --tolerance against them.
+
+Run from the repository root:
+    python -m benchmarks.run                           # all cases, scales 1 10 100 1000
+    python -m benchmarks.run --scales 1 10 --cases temp_scatter heatmap
+    python -m benchmarks.run --save                    # store the results as baselines
+    python -m benchmarks.run --check                   # exit code 1 on a regression
+"""
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+import streamlit.logger
+
+from data import aggregates, kpis
+from data.load_data import CLEANED_DATASET_PATH, TIMESERIES_PATH, TIMESERIES_SHEET, load_prepared_dataset
+from data.production_data import fold_rows, monthly_sums_for_year
+from data.synthetic import synthetic_cleaned_dataset, synthetic_timeseries_sheet, write_timeseries_sheet
+from data.timeseries_cache import CACHE_DIR, load_timeseries
+from plots import figure_cache, kpi_with_icons
+from plots.geography import build_kantonskarte_map
+from plots.heatmap import build_heatmap_import_export_fig
+from plots.kpi_with_icons import build_energy_kpis_html
+from plots.production import build_production_figs
+from plots.temperature_scatterplot import temp_scatter
+from plots.timeseries import build_high_res_time_series_fig, build_time_series_fig
+from utils import stats
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+GEOJSON_PATH = "data/geo/ch_cantons.geojson"
+TIMESERIES_STEM = "benchmark_timeseries"
+# time differences below this are noise, not regressions
+MIN_SECONDS_DELTA = 0.02
+# one year of 15-minute rows, the size of the current sheet (used without the workbook)
+TIMESERIES_BASE_ROWS = 96 * 365
+
+
+def _load_prepared_dataset(inputs):
+    return load_prepared_dataset(inputs["cleaned_path"])
+
+
+def _load_timeseries(inputs):
+    return load_timeseries(inputs["timeseries_path"], cache_dir=inputs["tmp_dir"] / "cache")
+
+
+def _kantonskarte(inputs):
+    m, _ = build_kantonskarte_map(
+        data_path=inputs["timeseries_path"],
+        geojson_path=GEOJSON_PATH,
+        feature_key="properties.name",
+    )
+    return m.get_root().render()
+
+
+def _temp_scatter(inputs):
+    fig = temp_scatter(inputs["cleaned"], width=None, height=360, compact=True, show_controls=False, legend_mode="client")
+    return fig.to_json()
+
+
+def _time_series(inputs):
+    return build_time_series_fig(inputs["cleaned"], height=180).to_json()
+
+
+def _high_res_time_series(inputs):
+    return build_high_res_time_series_fig(inputs["timeseries"], height=180).to_json()
+
+
+def _heatmap(inputs):
+    return build_heatmap_import_export_fig(inputs["cleaned"], height=171).to_json()
+
+
+def _monthly_sums(inputs):
+    state = fold_rows({"watermark": None, "partials": {}}, inputs["cleaned"])
+    return monthly_sums_for_year(state, inputs["cleaned"].index.max().year)
+
+
+def _production_plots(inputs):
+    bar, donut = build_production_figs(inputs["monthly"], height=171)
+    return bar.to_json() + donut.to_json()
+
+
+def _energy_kpis(inputs):
+    return build_energy_kpis_html(inputs["cleaned"])
+
+
+# name -> (function, input it scales with)
+CASES = {
+    "load_prepared_dataset": (_load_prepared_dataset, "cleaned"),
+    "load_timeseries": (_load_timeseries, "timeseries"),
+    "kantonskarte_map": (_kantonskarte, "timeseries"),
+    "temp_scatter": (_temp_scatter, "cleaned"),
+    "time_series": (_time_series, "cleaned"),
+    "high_res_time_series": (_high_res_time_series, "timeseries"),
+    "heatmap": (_heatmap, "cleaned"),
+    "monthly_sums": (_monthly_sums, "cleaned"),
+    "production_plots": (_production_plots, "cleaned"),
+    "energy_kpis": (_energy_kpis, "cleaned"),
+}
+
+
+def base_rows():
+    cleaned_rows = len(pd.read_csv(CLEANED_DATASET_PATH, usecols=["Datum"]))
+    timeseries_rows = TIMESERIES_BASE_ROWS
+    if Path(TIMESERIES_PATH).exists():
+        # row count of the real sheet, from its Parquet cache after the first run
+        timeseries_rows = len(load_timeseries(TIMESERIES_PATH, TIMESERIES_SHEET))
+    return {"cleaned": cleaned_rows, "timeseries": timeseries_rows}
+
+
+def prepare_inputs(scale, needs, rows, tmp_dir):
+    """Write the synthetic files of one scale (daily rows ending 2025) and load the frames the builders take."""
+    inputs = {"tmp_dir": tmp_dir}
+    if "cleaned" in needs:
+        inputs["cleaned_path"] = tmp_dir / "cleaned_dataset.csv"
+        df = synthetic_cleaned_dataset(end="2025-12-31", periods=rows["cleaned"] * scale, freq="D")
+        df.to_csv(inputs["cleaned_path"], index=False)
+        inputs["cleaned"] = load_prepared_dataset(inputs["cleaned_path"])
+        inputs["monthly"] = _monthly_sums(inputs)
+    if "timeseries" in needs:
+        inputs["timeseries_path"] = tmp_dir / f"{TIMESERIES_STEM}_x{scale}.csv"
+        sheet = synthetic_timeseries_sheet(end="2025-12-31 23:45", periods=rows["timeseries"] * scale)
+        write_timeseries_sheet(sheet, inputs["timeseries_path"])
+        inputs["timeseries"] = _load_timeseries(inputs)
+    return inputs
+
+
+def reset_caches(inputs):
+    """Cold start: drop every in-memory cache and the Parquet cache of the synthetic sheet."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    figure_cache.clear()
+    aggregates.clear()
+    kpis.clear()
+    kpi_with_icons.clear()
+    stats.clear()
+    shutil.rmtree(inputs["tmp_dir"] / "cache", ignore_errors=True)
+    for path in Path(CACHE_DIR).glob(f"{TIMESERIES_STEM}_*"):
+        path.unlink(missing_ok=True)
+
+
+def output_size(output):
+    if output is None:
+        return 0
+    if isinstance(output, pd.DataFrame):
+        return int(output.memory_usage(deep=True).sum())
+    return len(output.encode("utf-8"))
+
+
+def measure(func, inputs, repeats):
+    seconds = []
+    for _ in range(repeats):
+        reset_caches(inputs)
+        start = time.perf_counter()
+        output = func(inputs)
+        seconds.append(time.perf_counter() - start)
+
+    # separate run, tracemalloc slows down allocation-heavy code
+    reset_caches(inputs)
+    tracemalloc.start()
+    func(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": round(statistics.median(seconds), 4),
+        "peak_mb": round(peak / 2**20, 2),
+        "output_bytes": output_size(output),
+    }
+
+
+def load_baselines(path=BASELINES_PATH):
+    if not Path(path).exists():
+        return {"results": {}}
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def save_baselines(results, path=BASELINES_PATH):
+    """Merge `results` into the stored baselines (other cases and scales are kept)."""
+    baselines = load_baselines(path)
+    for case, by_scale in results.items():
+        baselines["results"].setdefault(case, {}).update(by_scale)
+    baselines["machine"] = f"{platform.platform()}, Python {platform.python_version()}"
+    Path(path).write_text(json.dumps(baselines, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def regressions(result, baseline, tolerance):
+    """Names of the metrics that grew by more than `tolerance` (0.5 = +50 %)."""
+    grown = []
+    for metric in ("seconds", "peak_mb", "output_bytes"):
+        old, new = baseline.get(metric), result[metric]
+        if old is None or new <= old * (1 + tolerance):
+            continue
+        if metric == "seconds" and new - old < MIN_SECONDS_DELTA:
+            continue
+        grown.append(metric)
+    return grown
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-rows", type=int, default=1_000_000, help="skip inputs with more rows")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--save", action="store_true", help="store the results as baselines")
+    parser.add_argument("--check", action="store_true", help="exit with 1 on a regression")
+    args = parser.parse_args(argv)
+
+    # bare mode: no runtime warnings from the caches
+    streamlit.logger.set_log_level("error")
+
+    rows = base_rows()
+    baselines = load_baselines(args.baselines)["results"]
+    results = {}
+    failed = False
+
+    print(f"{'case':<22} {'scale':>6} {'rows':>9} {'seconds':>9} {'peak MB':>9} {'output KB':>10}  vs. baseline")
+    for scale in args.scales:
+        needs = {CASES[case][1] for case in args.cases if rows[CASES[case][1]] * scale <= args.max_rows}
+        with tempfile.TemporaryDirectory() as tmp:
+            inputs = prepare_inputs(scale, needs, rows, Path(tmp))
+            for case in args.cases:
+                func, source = CASES[case]
+                n_rows = rows[source] * scale
+                if source not in needs:
+                    print(f"{case:<22} {scale:>6} {n_rows:>9} skipped (more than --max-rows)")
+                    continue
+
+                result = measure(func, inputs, args.repeats)
+                results.setdefault(case, {})[str(scale)] = result
+
+                baseline = baselines.get(case, {}).get(str(scale))
+                if baseline is None:
+                    note = "-"
+                else:
+                    grown = regressions(result, baseline, args.tolerance)
+                    failed |= bool(grown)
+                    note = "REGRESSION: " + ", ".join(grown) if grown else f"{result['seconds'] / max(baseline['seconds'], 1e-9):.2f}x time"
+                print(
+                    f"{case:<22} {scale:>6} {n_rows:>9} {result['seconds']:>9.3f} "
+                    f"{result['peak_mb']:>9.1f} {result['output_bytes'] / 1024:>10.1f}  {note}"
+                )
+            reset_caches(inputs)
+
+    if args.save:
+        save_baselines(results, args.baselines)
+        print(f"Baselines written to {args.baselines}")
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Materialized monthly / seasonal / yearly aggregates of the prepared dataset.
+
+All granularities are derived from one groupby over (Jahr, Monat): seasonal and
+yearly sums are folded from the monthly partial sums, means are sum / count.
+Results are memoized per (data version, metrics, date range) and dropped as
+soon as a new data version shows up.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from data.load_data import SEASONS, ensure_prepared, frame_version, source_version
+
+GRANULARITIES = ("month", "season", "year")
+
+_MAX_ENTRIES = 16
+_lock = threading.Lock()
+_store = OrderedDict()
+
+
+def _build_aggregates(df, metrics):
+    grouped = df[metrics].groupby([df.index.year.rename("Jahr"), df["Monat"]])
+    month_sum = grouped.sum()
+    month_count = grouped.count()
+
+    years = month_sum.index.get_level_values("Jahr")
+    seasons = month_sum.index.get_level_values("Monat").map(SEASONS).rename("Saison")
+
+    sums = {
+        "month": month_sum,
+        "season": month_sum.groupby([years, seasons]).sum(),
+        "year": month_sum.groupby(years).sum(),
+    }
+    counts = {
+        "month": month_count,
+        "season": month_count.groupby([years, seasons]).sum(),
+        "year": month_count.groupby(years).sum(),
+    }
+
+    result = {}
+    for granularity in GRANULARITIES:
+        total, count = sums[granularity], counts[granularity]
+        result[granularity] = pd.concat(
+            {"sum": total, "mean": total / count.where(count > 0), "count": count},
+            axis=1,
+        )
+    return result
+
+
+def measure_columns(df):
+    return [col for col in df.columns if col not in ("Monat", "Saison")]
+
+
+def get_aggregates(df, metrics=None, start=None, end=None):
+    """
+    Aggregates of `metrics` between `start` and `end` (inclusive, optional).
+    Without `metrics` all measures are aggregated, which lets every card share
+    one entry and pick its columns from it.
+
+    Returns {"month" | "season" | "year": DataFrame} with columns
+    (stat, metric) for stat in sum / mean / count. Month rows are indexed by
+    (Jahr, Monat), season rows by (Jahr, Saison), year rows by Jahr.
+    The returned frames are shared, do not modify them.
+    """
+    df = ensure_prepared(df)
+    metrics = measure_columns(df) if metrics is None else list(metrics)
+    version = frame_version(df)
+    key = (version, tuple(metrics), str(start), str(end))
+
+    with _lock:
+        if key in _store:
+            _store.move_to_end(key)
+            return _store[key][1]
+
+    source = source_version(df)
+    if start is not None or end is not None:
+        df = df.loc[start:end]
+    result = _build_aggregates(df, metrics)
+
+    with _lock:
+        # a new version of a source file invalidates everything computed from older ones
+        if source:
+            path = source.rsplit(":", 1)[0]
+            for old_key, (old_source, _) in list(_store.items()):
+                if old_source and old_source != source and old_source.rsplit(":", 1)[0] == path:
+                    del _store[old_key]
+
+        _store[key] = (source, result)
+        if len(_store) > _MAX_ENTRIES:
+            _store.popitem(last=False)
+    return result
+
+
+def clear():
+    with _lock:
+        _store.clear()
+
+
+def season_mean(df, season, metric):
+    """Mean of `metric` over all rows of `season` across all years."""
+    seasonal = get_aggregates(df)["season"]
+    rows = seasonal.index.get_level_values("Saison") == season
+    count = seasonal["count"].loc[rows, metric].sum()
+    return seasonal["sum"].loc[rows, metric].sum() / count if count else float("nan")
+
+
+def monthly_sums_by_month(df, metrics):
+    """Sums per calendar month (1-12) over all years, missing months as 0."""
+    monthly = get_aggregates(df)["month"]["sum"][list(metrics)]
+    return monthly.groupby(level="Monat").sum().reindex(range(1, 13)).fillna(0)
+
+
+def monthly_sums_by_date(df, metrics):
+    """Sums per month with month-end timestamps as index, gaps filled with 0."""
+    monthly = get_aggregates(df)["month"]["sum"][list(metrics)]
+    if monthly.empty:
+        return monthly
+    index = pd.to_datetime(
+        {
+            "year": monthly.index.get_level_values("Jahr"),
+            "month": monthly.index.get_level_values("Monat"),
+            "day": 1,
+        }
+    ) + pd.offsets.MonthEnd(0)
+    monthly = monthly.set_axis(pd.DatetimeIndex(index, name="Datum"))
+    return monthly.reindex(pd.date_range(index.min(), index.max(), freq="ME")).fillna(0)
@@ -0,0 +1,114 @@
+"""Column schema of the Zeitreihen0h15 sheet.
+
+Column names such as "Produktion Kanton ZH" or "Verbrauch Kantone AI, AR\\n..."
+are parsed once per workbook layout into a column -> canton weight matrix.
+Canton totals for any set of rows are then a single matrix product:
+
+    totals = values[:, schema["columns"][metric]] @ canton_weights(schema, metric)
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+CANTON_METRICS = ("Produktion", "Verbrauch")
+
+_COLUMN_RE = re.compile(r"^(?P<metric>\S+) Kantone? (?P<codes>.+)$")
+
+
+def parse_canton_column(column_name):
+    """(metric, [canton codes]) for a canton column, None for every other column."""
+    if not isinstance(column_name, str):
+        return None
+    # multi-line headers carry a description after the first line
+    header = column_name.split("\n", 1)[0].strip()
+    match = _COLUMN_RE.match(header)
+    if not match:
+        return None
+    codes = [code.strip() for code in match["codes"].split(",") if code.strip()]
+    return (match["metric"], codes) if codes else None
+
+
+@lru_cache(maxsize=8)
+def _build_column_schema(columns):
+    schema_columns = {metric: [] for metric in CANTON_METRICS}
+    schema_codes = {metric: [] for metric in CANTON_METRICS}
+
+    for col in columns:
+        parsed = parse_canton_column(col)
+        if parsed is None or parsed[0] not in schema_columns:
+            continue
+        metric, codes = parsed
+        schema_columns[metric].append(col)
+        schema_codes[metric].append(tuple(codes))
+
+    cantons = sorted({code for codes in schema_codes.values() for group in codes for code in group})
+    return {"columns": schema_columns, "codes": schema_codes, "cantons": cantons}
+
+
+def build_column_schema(columns):
+    """Canton columns per metric, their canton codes and the sorted list of all cantons."""
+    return _build_column_schema(tuple(columns))
+
+
+def canton_weights(schema, metric, split_mode="equal", split_weights=None):
+    """
+    Column x canton weight matrix for one metric.
+
+    split_mode:
+        "equal"    - a shared column is divided equally between its cantons
+        "weighted" - divided proportionally to `split_weights` (canton code -> weight),
+                     cantons without a weight count as 0; falls back to equal if all are 0
+        other      - every canton of a shared column receives the full value
+    """
+    canton_index = {code: i for i, code in enumerate(schema["cantons"])}
+    groups = schema["codes"][metric]
+    weights = np.zeros((len(groups), len(schema["cantons"])))
+
+    for row, codes in enumerate(groups):
+        idx = [canton_index[code] for code in codes]
+        if split_mode == "equal":
+            weights[row, idx] = 1 / len(codes)
+        elif split_mode == "weighted":
+            raw = np.array([float((split_weights or {}).get(code, 0)) for code in codes])
+            weights[row, idx] = raw / raw.sum() if raw.sum() > 0 else 1 / len(codes)
+        else:
+            weights[row, idx] = 1.0
+
+    return weights
+
+
+def build_canton_month_cube(df, split_mode):
+    """
+    Dense metric x month x canton array of sums.
+    Shared columns ("Kantone A, B") are split once here, so the map only has
+    to slice one month (or sum over all months for "Total").
+    """
+    if "Zeitstempel" in df.columns:
+        stamps = pd.to_datetime(df["Zeitstempel"], dayfirst=True, errors="coerce")
+        # rows without timestamp only count towards "Total"
+        month_keys = stamps.dt.to_period("M").astype(str).where(stamps.notna(), "")
+    else:
+        month_keys = pd.Series("", index=df.index)
+
+    months = sorted(month_keys.unique())
+    row_month = month_keys.map({month: i for i, month in enumerate(months)}).to_numpy()
+
+    schema = build_column_schema(df.columns)
+    values = np.zeros((len(CANTON_METRICS), len(months), len(schema["cantons"])))
+    present = np.zeros((len(CANTON_METRICS), len(schema["cantons"])), dtype=bool)
+
+    for m, metric in enumerate(CANTON_METRICS):
+        cols = schema["columns"][metric]
+        if not cols:
+            continue
+        data = df[cols].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype="float64")
+        monthly = np.zeros((len(months), len(cols)))
+        np.add.at(monthly, row_month, data)
+
+        weights = canton_weights(schema, metric, split_mode)
+        values[m] = monthly @ weights
+        present[m] = weights.any(axis=0)
+
+    return {"months": months, "cantons": schema["cantons"], "values": values, "present": present}
@@ -0,0 +1,203 @@
+"""Canton geometry for the choropleth map.
+
+The GeoJSON is parsed and merged once per process. Simplified and quantized
+variants are derived from it and cached as well, so reruns only copy the
+feature properties they annotate.
+"""
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+
+# Douglas-Peucker tolerance in degrees per level of detail (0.001° ≈ 100 m)
+DETAIL_TOLERANCES = {
+    "low": 0.01,      # zoom <= 6, whole country in a small card
+    "medium": 0.003,  # zoom 7, default map card
+    "high": 0.0,      # full resolution
+}
+
+
+def merge_features_by_property(geojson_obj, prop_key):
+    """Merge all (Multi)Polygon features with the same property value into one MultiPolygon."""
+    merged = {}
+
+    for feat in geojson_obj.get("features", []):
+        props = feat.get("properties", {})
+        name = props.get(prop_key)
+        if not name:
+            continue
+
+        geom = feat.get("geometry", {})
+        geom_type = geom.get("type")
+        coords = geom.get("coordinates", [])
+        if geom_type == "Polygon":
+            polygons = [coords]
+        elif geom_type == "MultiPolygon":
+            polygons = coords
+        else:
+            continue
+
+        entry = merged.setdefault(
+            name,
+            {
+                "type": "Feature",
+                "properties": {prop_key: name},
+                "geometry": {"type": "MultiPolygon", "coordinates": []},
+            },
+        )
+        entry["geometry"]["coordinates"].extend(polygons)
+
+    return {"type": "FeatureCollection", "features": list(merged.values())}
+
+
+def _iter_rings(geojson_obj):
+    for fi, feat in enumerate(geojson_obj["features"]):
+        for polygon in feat["geometry"]["coordinates"]:
+            for ring in polygon:
+                yield fi, ring
+
+
+def _douglas_peucker(points, tolerance):
+    """Indices of the points kept by Douglas-Peucker (first and last are always kept)."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        ab = b - a
+        length = np.hypot(*ab)
+        if length == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / length
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance:
+            split = start + 1 + idx
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return np.flatnonzero(keep)
+
+
+def _simplify_section(section, tolerance):
+    # Shared borders are walked in opposite directions by the two neighbours.
+    # Simplifying in a canonical direction makes both sides drop the same points.
+    reverse = tuple(section[0]) > tuple(section[-1])
+    points = section[::-1] if reverse else section
+    kept = points[_douglas_peucker(points, tolerance)]
+    return kept[::-1] if reverse else kept
+
+
+def simplify_feature_collection(geojson_obj, tolerance):
+    """
+    Topology-preserving simplification of merged MultiPolygon features.
+
+    Vertices where the set of cantons sharing a point changes (border junctions)
+    and ring start points are fixed anchors. Only the sections between anchors
+    are simplified, so neighbouring cantons keep identical shared borders.
+    """
+    if tolerance <= 0:
+        return geojson_obj
+
+    owners = defaultdict(set)
+    for fi, ring in _iter_rings(geojson_obj):
+        for point in ring:
+            owners[tuple(point)].add(fi)
+
+    anchors = set()
+    for _, ring in _iter_rings(geojson_obj):
+        keys = [tuple(point) for point in ring]
+        anchors.add(keys[0])
+        for prev, cur, nxt in zip(keys[-2:-1] + keys[:-1], keys, keys[1:] + keys[1:2]):
+            if owners[cur] != owners[prev] or owners[cur] != owners[nxt]:
+                anchors.add(cur)
+
+    features = []
+    for feat in geojson_obj["features"]:
+        polygons = []
+        for polygon in feat["geometry"]["coordinates"]:
+            rings = []
+            for ring in polygon:
+                points = np.asarray(ring, dtype=float)
+                cuts = [i for i, point in enumerate(ring) if tuple(point) in anchors]
+                if cuts[-1] != len(ring) - 1:
+                    cuts.append(len(ring) - 1)
+
+                parts = [points[:1]]
+                for start, end in zip(cuts, cuts[1:]):
+                    parts.append(_simplify_section(points[start:end + 1], tolerance)[1:])
+                simplified = np.concatenate(parts)
+
+                # collapsed rings would vanish from the map, keep them as they are
+                rings.append(simplified.tolist() if len(simplified) >= 4 else ring)
+            polygons.append(rings)
+        features.append({
+            "type": "Feature",
+            "properties": feat["properties"],
+            "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        })
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def quantize_feature_collection(geojson_obj, precision=4):
+    """Round coordinates to `precision` decimals and drop the resulting duplicate vertices."""
+    features = []
+    for feat in geojson_obj["features"]:
+        polygons = []
+        for polygon in feat["geometry"]["coordinates"]:
+            rings = []
+            for ring in polygon:
+                points = np.round(np.asarray(ring, dtype=float), precision)
+                changed = np.any(np.diff(points, axis=0) != 0, axis=1)
+                points = points[np.concatenate([[True], changed])]
+                rings.append(points.tolist() if len(points) >= 4 else ring)
+            polygons.append(rings)
+        features.append({
+            "type": "Feature",
+            "properties": feat["properties"],
+            "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        })
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def geojson_version(path):
+    stat = Path(path).stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+@st.cache_resource
+def _load_geojson(path, version):
+    with Path(path).open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def load_geojson(path):
+    """Parsed GeoJSON, shared across reruns and sessions. Do not mutate."""
+    return _load_geojson(str(path), geojson_version(path))
+
+
+@st.cache_resource
+def _load_canton_geometry(path, prop_key, detail, precision, version):
+    geometry = merge_features_by_property(_load_geojson(path, version), prop_key)
+    geometry = simplify_feature_collection(geometry, DETAIL_TOLERANCES[detail])
+    if precision is not None:
+        geometry = quantize_feature_collection(geometry, precision)
+    return geometry
+
+
+def load_canton_geometry(path, prop_key, detail="medium", precision=4):
+    """
+    Merged canton features at the given level of detail.
+    The result is shared across reruns and sessions: copy properties before annotating them.
+    """
+    return _load_canton_geometry(str(path), prop_key, detail, precision, geojson_version(path))
@@ -0,0 +1,209 @@
+"""Declarative KPIs, evaluated together once per data version.
+
+A KPI is a column, an aggregation ("sum", "mean", "max" or "idxmax") and an
+optional filter (column, value), e.g. ("Saison", "Winter"). All KPIs are
+answered by one pass over the prepared frame: per filter, the needed columns
+are summed, counted and maximised per year with numpy, so adding KPIs does not
+add scans.
+
+The snapshot holds the value of every KPI per year and the change against the
+previous year over the same period: if a year is incomplete (the data ends in
+July), the previous year is restricted to the same months and days, so a year
+to date is never compared with a full year.
+
+    snapshot = get_kpi_snapshot(df)
+    row = kpi_row(snapshot)             # latest year
+    row["consumption"]                  # {"value": ..., "previous": ..., "delta": ..., "delta_pct": ...}
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from data.load_data import ensure_prepared, frame_version
+
+AGGREGATIONS = ("sum", "mean", "max", "idxmax")
+
+KPIS = {
+    "net_production": {"column": "Nettoerzeugung Total", "agg": "sum"},
+    "consumption": {"column": "Landesverbrauch", "agg": "sum"},
+    "pumped_storage": {"column": "Verbrauch Speicherpumpen", "agg": "sum"},
+    "export": {"column": "Ausfuhr", "agg": "sum"},
+    "import": {"column": "Einfuhr", "agg": "sum"},
+    "rhine_flow": {"column": "Wasserführung Rhein", "agg": "sum"},
+    "winter_consumption_mean": {"column": "Landesverbrauch", "agg": "mean", "filter": ("Saison", "Winter")},
+    "summer_production_mean": {"column": "Nettoerzeugung Total", "agg": "mean", "filter": ("Saison", "Sommer")},
+    "production_peak": {"column": "Nettoerzeugung Total", "agg": "max"},
+    "production_peak_date": {"column": "Nettoerzeugung Total", "agg": "idxmax"},
+}
+
+_MAX_ENTRIES = 32
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+
+def _filter_mask(df, row_filter):
+    if row_filter is None:
+        return np.ones(len(df), dtype=bool)
+    column, value = row_filter
+    return (df[column] == value).to_numpy(dtype=bool)
+
+
+def _evaluate(df, kpis):
+    years, starts, year_codes = np.unique(df.index.year, return_index=True, return_inverse=True)
+    values = {name: [None] * len(years) for name in kpis}
+
+    filters = {}
+    for name, kpi in kpis.items():
+        if kpi["column"] in df.columns:
+            filters.setdefault(kpi.get("filter"), set()).add(kpi["column"])
+
+    for row_filter, columns in filters.items():
+        columns = sorted(columns)
+        data = df[columns].to_numpy(dtype="float64")
+        valid = ~np.isnan(data) & _filter_mask(df, row_filter)[:, None]
+
+        # the prepared index is sorted: every year is one block starting at `starts`
+        sums = np.add.reduceat(np.where(valid, data, 0.0), starts, axis=0)
+        counts = np.add.reduceat(valid.astype("int64"), starts, axis=0)
+        maxima = np.maximum.reduceat(np.where(valid, data, -np.inf), starts, axis=0)
+
+        # first row per year and column that reaches the maximum
+        is_max = valid & (data == maxima[year_codes])
+        first_max = {}
+        for col in range(len(columns)):
+            rows = np.flatnonzero(is_max[:, col])
+            codes, first = np.unique(year_codes[rows], return_index=True)
+            first_max[col] = dict(zip(codes, df.index[rows[first]]))
+
+        for name, kpi in kpis.items():
+            if kpi.get("filter") != row_filter or kpi["column"] not in columns:
+                continue
+            col = columns.index(kpi["column"])
+            has_data = counts[:, col] > 0
+            if kpi["agg"] == "sum":
+                result = sums[:, col]
+            elif kpi["agg"] == "mean":
+                result = np.divide(sums[:, col], counts[:, col], out=np.full(len(years), np.nan), where=has_data)
+            elif kpi["agg"] == "max":
+                result = maxima[:, col]
+            else:
+                result = [first_max[col].get(code) for code in range(len(years))]
+            if kpi["agg"] != "idxmax":
+                result = [float(value) for value in result]
+            values[name] = [value if ok else None for value, ok in zip(result, has_data)]
+
+    return {int(year): {name: values[name][i] for name in kpis} for i, year in enumerate(years)}
+
+
+def _year_rows(index, year):
+    # the prepared index is sorted, a year is one contiguous block
+    return slice(
+        index.searchsorted(pd.Timestamp(year, 1, 1)),
+        index.searchsorted(pd.Timestamp(year + 1, 1, 1)),
+    )
+
+
+def _previous_values(df, by_year, kpis):
+    """
+    {year: values of year - 1 over the same period}, None if year - 1 has no data.
+    The period is the months `year` covers, up to its last day.
+    """
+    months = df.index.month.to_numpy()
+    days = df.index.day.to_numpy()
+    previous = {}
+    for year in by_year:
+        if year - 1 not in by_year:
+            previous[year] = None
+            continue
+        current, rows = _year_rows(df.index, year), _year_rows(df.index, year - 1)
+        last_month, last_day = months[current.stop - 1], days[current.stop - 1]
+        mask = np.isin(months[rows], np.unique(months[current])) & ~(
+            (months[rows] == last_month) & (days[rows] > last_day)
+        )
+        if mask.all():
+            # previous year fully comparable, reuse its values
+            previous[year] = by_year[year - 1]
+        else:
+            previous[year] = _evaluate(df.iloc[rows][mask], kpis).get(year - 1, dict.fromkeys(kpis))
+    return previous
+
+
+def build_kpi_snapshot(df, kpis=None):
+    """
+    Values of all `kpis` per year, the values of the previous year over the same
+    period ("previous") and the year-over-year deltas of the numeric ones.
+    """
+    kpis = KPIS if kpis is None else kpis
+    unknown = sorted(name for name, kpi in kpis.items() if kpi["agg"] not in AGGREGATIONS)
+    if unknown:
+        raise ValueError("Unbekannte Aggregation für KPI: " + ", ".join(unknown))
+    df = ensure_prepared(df)
+    by_year = _evaluate(df, kpis) if len(df) else {}
+    previous = _previous_values(df, by_year, kpis)
+
+    deltas = {}
+    for year, current in by_year.items():
+        deltas[year] = {}
+        for name, value in current.items():
+            before = None if previous[year] is None else previous[year][name]
+            numeric = kpis[name]["agg"] != "idxmax" and value is not None and before is not None
+            deltas[year][name] = float(value - before) if numeric else None
+
+    return {"years": sorted(by_year), "values": by_year, "previous": previous, "deltas": deltas}
+
+
+def get_kpi_snapshot(df, kpis=None):
+    """Cached build_kpi_snapshot(), one entry per data version. The snapshot is shared, do not modify it."""
+    kpis = KPIS if kpis is None else kpis
+    definition = tuple(
+        (name, kpi["column"], kpi["agg"], kpi.get("filter")) for name, kpi in sorted(kpis.items())
+    )
+    key = (frame_version(df), definition)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    snapshot = build_kpi_snapshot(df, kpis)
+    with _lock:
+        _cache[key] = snapshot
+        if len(_cache) > _MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return snapshot
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+def kpi_row(snapshot, year=None):
+    """
+    {kpi: {"value", "previous", "delta", "delta_pct"}} for `year` (default:
+    latest year), empty if the year has no data. "previous" covers the same
+    period of the year before. Missing values and deltas are None.
+    """
+    if year is None:
+        year = snapshot["years"][-1] if snapshot["years"] else None
+    if year not in snapshot["values"]:
+        return {}
+    previous = snapshot["previous"][year] or {}
+
+    row = {}
+    for name, value in snapshot["values"][year].items():
+        delta = snapshot["deltas"][year][name]
+        before = previous.get(name)
+        row[name] = {
+            "value": value,
+            "previous": before,
+            "delta": delta,
+            "delta_pct": delta / abs(before) * 100 if delta is not None and before else None,
+        }
+    return row
+
+
+def kpi_value(snapshot, name, year=None, default=float("nan")):
+    value = kpi_row(snapshot, year).get(name, {}).get("value")
+    return default if value is None else value
@@ -1,14 +1,222 @@
+import weakref
+from pathlib import Path
+
 import pandas as pd
 import streamlit as st
 
+from data.partitioned_store import read_partitioned, store_exists, store_version
+from data.timeseries_cache import (
+    TIMESTAMP_COL,
+    load_timeseries,
+    read_timeseries_window,
+    source_fingerprint,
+    timeseries_columns,
+)
+from utils.instrumentation import cache_miss, timed
+
+CLEANED_DATASET_PATH = "data/processed/cleaned_dataset.csv"
+TIMESERIES_PATH = "data/raw/EnergieUebersichtCH-2025-2.xlsx"
+TIMESERIES_SHEET = "Zeitreihen0h15"
+
+# Frames returned by the loaders. pandas copies attrs onto derived frames
+# (copies, slices, arithmetic), so attrs["version"] is only trusted for these objects.
+_versioned_frames = weakref.WeakValueDictionary()
+
+SEASONS = {
+    12: "Winter", 1: "Winter", 2: "Winter",
+    3: "Frühling", 4: "Frühling", 5: "Frühling",
+    6: "Sommer", 7: "Sommer", 8: "Sommer",
+    9: "Herbst", 10: "Herbst", 11: "Herbst",
+}
+
+
+def data_version(path):
+    # changes whenever the file is replaced, used as part of cache keys
+    if _uses_store(path):
+        return f"store-{store_version()}"
+    stat = Path(path).stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _uses_store(path):
+    # the partitioned store replaces the CSV once it has been built
+    return path == CLEANED_DATASET_PATH and store_exists()
+
+
+def year_range(year, first_year=None):
+    """(start, end) of `year`, from the start of `first_year` if given."""
+    if year is None:
+        return None, None
+    first_year = year if first_year is None else first_year
+    return f"{first_year}-01-01", f"{year}-12-31 23:59:59"
+
+
+def _read_cleaned(path, start=None, end=None, columns=None):
+    if _uses_store(path):
+        return read_partitioned(start, end, columns)
+
+    usecols = None if columns is None else ["Datum"] + [c for c in columns if c != "Datum"]
+    df = pd.read_csv(path, usecols=usecols)
+    if start is None and end is None:
+        return df
+    datum = pd.to_datetime(df["Datum"], errors="coerce")
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= datum >= pd.Timestamp(start)
+    if end is not None:
+        mask &= datum <= pd.Timestamp(end)
+    return df[mask].reset_index(drop=True)
+
+
 @st.cache_data
-def load_monthly_sums():
+def _load_monthly_sums():
+    cache_miss()
     return pd.read_csv("data/processed/monthly_sums.csv")
 
+
+def load_monthly_sums():
+    with timed("prep", cached=True):
+        return _load_monthly_sums()
+
+
 @st.cache_data
 def load_geo_data():
     return pd.read_csv("data/processed/cantons.csv")
 
 @st.cache_data
-def load_cleaned_dataset() -> pd.DataFrame:
-    return pd.read_csv("data/processed/cleaned_dataset.csv")
+def _load_cleaned_dataset(start, end, columns, version):
+    return _read_cleaned(CLEANED_DATASET_PATH, start, end, None if columns is None else list(columns))
+
+
+def load_cleaned_dataset(start=None, end=None, columns=None) -> pd.DataFrame:
+    """
+    Raw cleaned dataset, optionally limited to a date range and a column list.
+    Reads only the matching partitions when the partitioned store exists.
+    """
+    columns = None if columns is None else tuple(columns)
+    return _load_cleaned_dataset(start, end, columns, data_version(CLEANED_DATASET_PATH))
+
+
+def prepare_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Typed frame shared by all plots: DatetimeIndex "Datum", float64 measures
+    and the derived columns "Monat" (1-12) and "Saison".
+    """
+    df = df.copy()
+    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
+    df = df.dropna(subset=["Datum"]).set_index("Datum").sort_index()
+
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    df["Monat"] = df.index.month.astype("int8")
+    df["Saison"] = pd.Categorical(
+        df["Monat"].map(SEASONS),
+        categories=["Winter", "Frühling", "Sommer", "Herbst"],
+    )
+    return df
+
+
+def is_prepared(df: pd.DataFrame) -> bool:
+    return isinstance(df.index, pd.DatetimeIndex) and "Monat" in df.columns
+
+
+def ensure_prepared(df: pd.DataFrame) -> pd.DataFrame:
+    """Return prepared frames unchanged (no copy), prepare raw ones."""
+    return df if is_prepared(df) else prepare_dataset(df)
+
+
+def _set_version(df, version):
+    df.attrs["version"] = version
+    _versioned_frames[id(df)] = df
+
+
+def source_version(df):
+    """File version of a frame returned by a loader, None for any other (e.g. derived) frame."""
+    if _versioned_frames.get(id(df)) is df:
+        return df.attrs.get("version")
+    return None
+
+
+def frame_version(df: pd.DataFrame) -> str:
+    """
+    Cheap identifier of a frame's contents for cache keys.
+    Uses the file version of frames returned by the loaders, otherwise hashes the
+    contents (fine for small frames such as the monthly sums). Derived frames
+    are always hashed: they carry the attrs of their source, not its values.
+    """
+    version = source_version(df)
+    if version is not None:
+        bounds = f"{df.index[0]}-{df.index[-1]}" if len(df) else "empty"
+        return f"{version}-{df.shape}-{bounds}"
+    content_hash = int(pd.util.hash_pandas_object(df, index=True).sum())
+    return f"{df.shape}-{hash(tuple(df.columns))}-{content_hash}"
+
+
+# a few ranges in use at once (year, previous year..year, all years); older versions are evicted
+@st.cache_resource(max_entries=8)
+def _load_prepared_dataset(path, start, end, version):
+    cache_miss()
+    df = prepare_dataset(_read_cleaned(path, start, end))
+    _set_version(df, f"{path}[{start}..{end}]:{version}")
+    return df
+
+
+def load_prepared_dataset(path=CLEANED_DATASET_PATH, year=None, first_year=None) -> pd.DataFrame:
+    """
+    Prepared dataset (of one year, if given, or of first_year..year), parsed once
+    per data version and shared across reruns and sessions. Treat it as read-only.
+    """
+    start, end = year_range(year, first_year)
+    with timed("prep", cached=True):
+        return _load_prepared_dataset(path, start, end, data_version(path))
+
+
+# whole 15-minute sheets: keep the current version and at most one other
+@st.cache_resource(max_entries=2)
+def _load_timeseries_frame(path, sheet_name, version):
+    cache_miss()
+    df = load_timeseries(path, sheet_name)
+    _set_version(df, f"{path}/{sheet_name}:{version}")
+    return df
+
+
+def load_timeseries_frame(path=TIMESERIES_PATH, sheet_name=TIMESERIES_SHEET) -> pd.DataFrame:
+    """
+    Typed 15-minute sheet, loaded once per workbook version and shared across
+    reruns and sessions. Treat it as read-only.
+    """
+    with timed("prep", cached=True):
+        return _load_timeseries_frame(str(path), sheet_name, source_fingerprint(path))
+
+
+@st.cache_data
+def _load_timeseries_index(path, sheet_name, version):
+    cache_miss()
+    stamps = read_timeseries_window(path, sheet_name, columns=[])[TIMESTAMP_COL].dropna()
+    bounds = (None, None) if stamps.empty else (stamps.min(), stamps.max())
+    return bounds, timeseries_columns(path, sheet_name)
+
+
+def load_timeseries_index(path=TIMESERIES_PATH, sheet_name=TIMESERIES_SHEET):
+    """((first, last) Zeitstempel, column names) of the 15-minute sheet, without loading its values."""
+    with timed("prep", cached=True):
+        return _load_timeseries_index(str(path), sheet_name, source_fingerprint(path))
+
+
+@st.cache_resource(max_entries=16)
+def _load_timeseries_window(path, sheet_name, start, end, columns, version):
+    cache_miss()
+    df = read_timeseries_window(path, sheet_name, start, end, None if columns is None else list(columns))
+    _set_version(df, f"{path}/{sheet_name}[{start}..{end}]{columns}:{version}")
+    return df
+
+
+def load_timeseries_window(path=TIMESERIES_PATH, sheet_name=TIMESERIES_SHEET, start=None, end=None, columns=None):
+    """
+    Rows of the 15-minute sheet between `start` and `end`, only `columns`, read
+    from the Parquet cache without loading the whole sheet. Treat it as read-only.
+    """
+    columns = None if columns is None else tuple(columns)
+    with timed("prep", cached=True):
+        return _load_timeseries_window(str(path), sheet_name, start, end, columns, source_fingerprint(path))
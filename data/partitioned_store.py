@@ -0,0 +1,91 @@
+"""Year/month partitioned Parquet store for the cleaned BFE dataset.
+
+Layout: data/processed/cleaned_store/Jahr=2025/Monat=1/<file>.parquet
+
+Reads go through pyarrow.dataset with a partition filter and a column list,
+so only the partitions of the requested date range and the requested columns
+are read from disk, regardless of how many years are stored.
+
+Build or update the store from a CSV (only the partitions in the CSV are replaced):
+    python -m data.partitioned_store data/processed/cleaned_dataset.csv
+"""
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+STORE_DIR = "data/processed/cleaned_store"
+VERSION_FILE = "_version"
+
+
+def store_exists(store_dir=STORE_DIR):
+    return (Path(store_dir) / VERSION_FILE).exists()
+
+
+def store_version(store_dir=STORE_DIR):
+    """Changes with every write to the store, used as part of cache keys."""
+    return (Path(store_dir) / VERSION_FILE).read_text(encoding="utf-8").strip()
+
+
+def available_years(store_dir=STORE_DIR):
+    return sorted(int(path.name.split("=", 1)[1]) for path in Path(store_dir).glob("Jahr=*"))
+
+
+def write_partitioned_store(df_raw, store_dir=STORE_DIR):
+    """Write a raw frame (CSV layout with a "Datum" column) into its year/month partitions."""
+    df = df_raw.copy()
+    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
+    df = df.dropna(subset=["Datum"]).sort_values("Datum")
+    df["Jahr"] = df["Datum"].dt.year
+    df["Monat"] = df["Datum"].dt.month
+
+    store = Path(store_dir)
+    store.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(
+        store,
+        index=False,
+        partition_cols=["Jahr", "Monat"],
+        existing_data_behavior="delete_matching",
+    )
+    (store / VERSION_FILE).write_text(str(time.time_ns()), encoding="utf-8")
+
+
+def _partition_filter(start, end):
+    import pyarrow.dataset as pads
+
+    year, month, datum = pads.field("Jahr"), pads.field("Monat"), pads.field("Datum")
+    expr = None
+    if start is not None:
+        start = pd.Timestamp(start)
+        lower = (year > start.year) | ((year == start.year) & (month >= start.month))
+        expr = lower & (datum >= start)
+    if end is not None:
+        end = pd.Timestamp(end)
+        upper = (year < end.year) | ((year == end.year) & (month <= end.month))
+        upper = upper & (datum <= end)
+        expr = upper if expr is None else expr & upper
+    return expr
+
+
+def read_partitioned(start=None, end=None, columns=None, store_dir=STORE_DIR):
+    """
+    Rows between `start` and `end` (inclusive) in the CSV layout.
+    Partitions outside the range are pruned; only `columns` (plus "Datum") are read.
+    """
+    import pyarrow.dataset as pads
+
+    dataset = pads.dataset(store_dir, format="parquet", partitioning="hive")
+    if columns is not None:
+        columns = ["Datum"] + [col for col in columns if col != "Datum"]
+
+    table = dataset.to_table(columns=columns, filter=_partition_filter(start, end))
+    df = table.to_pandas()
+    df = df.drop(columns=[col for col in ("Jahr", "Monat") if col in df.columns])
+    return df.sort_values("Datum").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "data/processed/cleaned_dataset.csv"
+    write_partitioned_store(pd.read_csv(source))
+    print(f"{source} -> {STORE_DIR}, years: {available_years()}")
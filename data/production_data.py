@@ -1,28 +1,168 @@
-import numpy as np
+"""Incremental build of data/processed/monthly_sums.csv.
+
+Unrounded per-(Jahr, Monat) sums, the last ingested date (watermark) and the
+byte offset up to which each input file was read are kept in a state file. The
+cleaned dataset only grows at the end, so a run seeks to the stored offset and
+parses only the appended rows; rows at or before the watermark are dropped on
+the raw date column before they are prepared. A daily refresh costs as much as
+the new rows, not the whole history. If the file was replaced (the last line
+read no longer ends at the offset), it is read again from the start and
+filtered by the watermark. A last line without a line break counts as complete
+on a full read and once the file size no longer changes between runs.
+
+Run from the repository root:
+    python -m data.production_data                 # fold in new rows of cleaned_dataset.csv
+    python -m data.production_data --input new.csv # fold in a delivery of new rows
+    python -m data.production_data --full          # rebuild the state from scratch
+    python -m data.production_data --year 2024     # write the sums of another year
+"""
+import argparse
+import io
+import json
+from pathlib import Path
+
 import pandas as pd
 
+from data.aggregates import get_aggregates
+from data.load_data import CLEANED_DATASET_PATH, prepare_dataset
 
-df = pd.read_csv('processed/cleaned_dataset.csv')
+MONTHLY_SUMS_PATH = "data/processed/monthly_sums.csv"
+STATE_PATH = "data/processed/monthly_sums_state.json"
 
 # List of columns to calculate monthly sums for
 columns_to_process = [
-    'Laufwerke', 'Speicherwerke', 'Total Hydraulisch', 'Kernkraftwerke', 
+    'Laufwerke', 'Speicherwerke', 'Total Hydraulisch', 'Kernkraftwerke',
     'Thermisch', 'Windkraft', 'Photovoltaik', 'Total Erneuerbar'
 ]
 
-# Group by month, sum the specified columns and round
-df['Datum'] = pd.to_datetime(df['Datum'], errors='coerce')
-df_monthly_sums = df[df['Datum'].dt.year == 2025].groupby(df['Datum'].dt.strftime('%m'))[columns_to_process].sum().round(1)
 
-# Reset the index to make 'Monat' a column
-df_monthly_sums = df_monthly_sums.reset_index()
+def load_state(path=STATE_PATH):
+    state_file = Path(path)
+    if not state_file.exists():
+        return {"watermark": None, "positions": {}, "partials": {}}
+    with state_file.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_state(state, path=STATE_PATH):
+    state_file = Path(path)
+    tmp = state_file.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=1)
+    tmp.replace(state_file)
+
+
+def _read_appended(path, position):
+    """
+    (header line, complete lines after `position`, position after them). `position`
+    is {"offset", "tail", "size"}: the last line read before must still end at the
+    offset, otherwise the file was replaced and is read from the start.
+    """
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        offset, tail = position.get("offset", 0), position.get("tail", "").encode("utf-8")
+        if offset and tail:
+            handle.seek(max(offset - len(tail), 0))
+            if handle.read(len(tail)) != tail:
+                # Datei ersetzt statt ergänzt: von vorne lesen, das Watermark filtert
+                offset = 0
+            elif not tail.endswith(b"\n"):
+                # letzte Zeile ohne Zeilenende nochmals lesen, das Watermark verwirft sie falls schon gezählt
+                offset -= len(tail)
+        handle.seek(max(offset, len(header)))
+        start = handle.tell()
+        body = handle.read()
+        size = handle.tell()
+    if offset and not body.endswith(b"\n") and size != position.get("size"):
+        # die Datei wächst noch: eine unfertige letzte Zeile bleibt für den nächsten Lauf
+        body = body[: body.rfind(b"\n") + 1]
+    if not body:
+        return header, body, {**position, "size": size}
+    last_line = body[body.rstrip(b"\n").rfind(b"\n") + 1:]
+    return header, body, {"offset": start + len(body), "tail": last_line.decode("utf-8"), "size": size}
+
+
+def read_new_rows(path, watermark, position=None, chunksize=50_000):
+    """
+    Rows of `path` dated after `watermark`, read chunk by chunk from the stored
+    read position on. Returns (prepared frame or None, position for the next run).
+    """
+    header, body, position = _read_appended(path, position or {})
+    if not body.strip():
+        return None, position
+
+    chunks = []
+    for chunk in pd.read_csv(io.BytesIO(header + body), chunksize=chunksize):
+        if watermark is not None:
+            # nur die Datumsspalte parsen, alte Zeilen nie aufbereiten
+            dates = pd.to_datetime(chunk["Datum"], errors="coerce")
+            chunk = chunk[dates > pd.Timestamp(watermark)]
+        if not chunk.empty:
+            chunks.append(prepare_dataset(chunk))
+    if not chunks:
+        return None, position
+    return pd.concat(chunks).sort_index(), position
+
+
+def fold_rows(state, df_new):
+    """Add the monthly sums of `df_new` to the partial sums and advance the watermark."""
+    monthly = get_aggregates(df_new, columns_to_process)["month"]["sum"]
+    partials = state["partials"]
+
+    for (year, month), row in monthly.iterrows():
+        key = f"{year}-{month:02d}"
+        previous = partials.get(key, {})
+        partials[key] = {
+            col: previous.get(col, 0.0) + float(row[col]) for col in columns_to_process
+        }
+
+    state["watermark"] = df_new.index.max().isoformat()
+    return state
+
+
+def monthly_sums_for_year(state, year):
+    """Rows "01" ... "12" of `year` (rounded) plus a Total row, in the format of monthly_sums.csv."""
+    rows = []
+    for key in sorted(state["partials"]):
+        key_year, month = key.split("-")
+        if int(key_year) != year:
+            continue
+        values = {col: round(state["partials"][key][col], 1) for col in columns_to_process}
+        rows.append({"Monat": month, **values})
+
+    df_monthly_sums = pd.DataFrame(rows, columns=["Monat"] + columns_to_process)
+
+    # Add a row with total sums for each column at the end
+    total_row = pd.DataFrame(df_monthly_sums[columns_to_process].sum()).T
+    total_row['Monat'] = 'Total'
+    return pd.concat([df_monthly_sums, total_row], ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=CLEANED_DATASET_PATH)
+    parser.add_argument("--output", default=MONTHLY_SUMS_PATH)
+    parser.add_argument("--state", default=STATE_PATH)
+    parser.add_argument("--year", type=int, default=None, help="defaults to the latest year")
+    parser.add_argument("--full", action="store_true", help="ignore the stored state")
+    args = parser.parse_args(argv)
+
+    state = {"watermark": None, "positions": {}, "partials": {}} if args.full else load_state(args.state)
+
+    # one read position per input file, a new delivery (--input) starts at the beginning
+    positions = state.setdefault("positions", {})
+    df_new, positions[args.input] = read_new_rows(args.input, state["watermark"], positions.get(args.input))
+    if df_new is not None:
+        state = fold_rows(state, df_new)
+    save_state(state, args.state)
+    print(f"{0 if df_new is None else len(df_new)} new rows, watermark {state['watermark']}")
 
-# Rename the date column to 'Monat'
-df_monthly_sums.rename(columns={'Datum': 'Monat'}, inplace=True)
+    years = sorted({int(key.split("-")[0]) for key in state["partials"]})
+    if not years:
+        return
+    year = args.year or years[-1]
+    monthly_sums_for_year(state, year).to_csv(args.output, index=False)
 
-# Add a row with total sums for each column at the end
-total_row = pd.DataFrame(df_monthly_sums[columns_to_process].sum()).T
-total_row['Monat'] = 'Total'
-df_monthly_sums = pd.concat([df_monthly_sums, total_row], ignore_index=True)
 
-df_monthly_sums.to_csv('processed/monthly_sums.csv', index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
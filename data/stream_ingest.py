@@ -0,0 +1,107 @@
+"""Streaming ingest of the 15-minute BFE time series.
+
+The Zeitreihen0h15 sheet (or a CSV export of it) is read in row chunks and
+each chunk is folded straight into the canton x month cube and the national
+monthly sums. Only one chunk is held in memory at a time, so peak memory does
+not grow with the length of the workbook.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data.canton_schema import CANTON_METRICS, build_canton_month_cube, parse_canton_column
+
+CHUNK_ROWS = 20_000
+# Workbooks above this size are processed chunk by chunk instead of being loaded whole
+STREAMING_MIN_BYTES = 50 * 1024 * 1024
+
+
+def iter_excel_chunks(path, sheet_name="Zeitreihen0h15", chunk_rows=CHUNK_ROWS):
+    """DataFrames of `chunk_rows` rows from an openpyxl read-only stream of the sheet."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = [str(col) if col is not None else f"Spalte {i}" for i, col in enumerate(next(rows))]
+        next(rows, None)  # units row (kWh)
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_rows:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(path, chunk_rows=CHUNK_ROWS):
+    # CSV export of the sheet, with the units row below the header
+    yield from pd.read_csv(path, skiprows=[1], chunksize=chunk_rows)
+
+
+def iter_chunks(path, sheet_name="Zeitreihen0h15", chunk_rows=CHUNK_ROWS):
+    if Path(path).suffix.lower() == ".csv":
+        return iter_csv_chunks(path, chunk_rows)
+    return iter_excel_chunks(path, sheet_name, chunk_rows)
+
+
+def national_columns(columns):
+    """Numeric columns of the sheet that are not per canton (national totals)."""
+    return [col for col in columns if col != "Zeitstempel" and parse_canton_column(col) is None]
+
+
+def _merge_cube(total, cube):
+    if total is None:
+        return cube
+
+    months = sorted(set(total["months"]) | set(cube["months"]))
+    index = {month: i for i, month in enumerate(months)}
+    values = np.zeros((len(CANTON_METRICS), len(months), len(total["cantons"])))
+    for part in (total, cube):
+        positions = [index[month] for month in part["months"]]
+        values[:, positions, :] += part["values"]
+
+    return {
+        "months": months,
+        "cantons": total["cantons"],
+        "values": values,
+        "present": total["present"] | cube["present"],
+    }
+
+
+def stream_aggregate(path, sheet_name="Zeitreihen0h15", split_mode="equal", chunk_rows=CHUNK_ROWS):
+    """
+    Aggregate the sheet chunk by chunk.
+
+    Returns (cube, national): the canton x month cube in the layout of
+    build_canton_month_cube() and a DataFrame of the other numeric columns
+    summed per month ("YYYY-MM").
+    """
+    cube = None
+    national_parts = []
+
+    for chunk in iter_chunks(path, sheet_name, chunk_rows):
+        cube = _merge_cube(cube, build_canton_month_cube(chunk, split_mode))
+
+        cols = national_columns(chunk.columns)
+        if cols and "Zeitstempel" in chunk.columns:
+            stamps = pd.to_datetime(chunk["Zeitstempel"], dayfirst=True, errors="coerce")
+            numeric = chunk[cols].apply(pd.to_numeric, errors="coerce")
+            national_parts.append(numeric.groupby(stamps.dt.to_period("M").astype(str)).sum())
+
+    if cube is None:
+        cube = build_canton_month_cube(pd.DataFrame(), split_mode)
+
+    if national_parts:
+        # one row per month and chunk, tiny compared to the raw rows
+        national = pd.concat(national_parts).groupby(level=0).sum()
+        national = national.drop(index="NaT", errors="ignore")
+        national.index.name = "Monat"
+    else:
+        national = pd.DataFrame()
+    return cube, national
@@ -0,0 +1,219 @@
+"""Deterministic synthetic data in the shape of the BFE files.
+
+Generates, for any date range and resolution:
+- the cleaned dataset: the columns of data/processed/cleaned_dataset.csv in
+  GWh per day, with the same identities as the real file (Total Hydraulisch =
+  Laufwerke + Speicherwerke, Landesverbrauch = Nettoerzeugung Total + Überschuss, ...)
+- the Zeitreihen0h15 sheet: Zeitstempel ("%d.%m.%Y %H:%M", end of the interval),
+  national columns and "Produktion Kanton XX" / "Verbrauch Kantone A, B" columns
+  in kWh per interval, with the units row below the header
+
+Values follow seasonal, weekly and daily cycles plus noise. The same seed and
+arguments always give the same data.
+
+Run from the repository root:
+    python -m data.synthetic --years 2015 2024                 # ten years into data/synthetic/
+    python -m data.synthetic --years 2025 --resolution 1h --sheet-format xlsx
+    python -m data.production_data --input data/synthetic/cleaned_dataset.csv --full --output data/synthetic/monthly_sums.csv
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+OUTPUT_DIR = "data/synthetic"
+SHEET_NAME = "Zeitreihen0h15"
+TIMESTAMP_FORMAT = "%d.%m.%Y %H:%M"
+
+CLEANED_COLUMNS = [
+    "Datum", "Laufwerke", "Speicherwerke", "Total Hydraulisch", "Kernkraftwerke",
+    "Thermisch", "Windkraft", "Photovoltaik", "Total Erneuerbar", "Verbrauch Speicherpumpen",
+    "Nettoerzeugung Total", "Einfuhr", "Ausfuhr", "Überschuss", "Landesverbrauch",
+    "Mittlere Tagestemperatur", "Wasserführung Rhein", "Wasserführung in %",
+]
+
+# Share of the national production / consumption per canton (rough orders of magnitude)
+PRODUCTION_SHARES = {
+    "AG": 0.17, "AI": 0.002, "AR": 0.002, "BE": 0.12, "BL": 0.005, "BS": 0.005, "FR": 0.02,
+    "GE": 0.02, "GL": 0.02, "GR": 0.13, "JU": 0.002, "LU": 0.01, "NE": 0.01, "NW": 0.005,
+    "OW": 0.01, "SG": 0.03, "SH": 0.005, "SO": 0.14, "SZ": 0.02, "TG": 0.01, "TI": 0.07,
+    "UR": 0.03, "VD": 0.03, "VS": 0.15, "ZG": 0.002, "ZH": 0.02,
+}
+CONSUMPTION_SHARES = {
+    "AG": 0.08, "AI": 0.002, "AR": 0.006, "BE": 0.12, "BL": 0.03, "BS": 0.03, "FR": 0.04,
+    "GE": 0.05, "GL": 0.005, "GR": 0.03, "JU": 0.01, "LU": 0.05, "NE": 0.02, "NW": 0.005,
+    "OW": 0.005, "SG": 0.06, "SH": 0.01, "SO": 0.04, "SZ": 0.02, "TG": 0.03, "TI": 0.04,
+    "UR": 0.005, "VD": 0.09, "VS": 0.05, "ZG": 0.015, "ZH": 0.16,
+}
+# cantons reported together in one column, as in the published sheet
+SHARED_CANTONS = [("AI", "AR"), ("BE", "JU"), ("BL", "BS"), ("OW", "NW", "UR"), ("SZ", "ZG")]
+# production that is not assigned to a canton
+ACROSS_CANTONS_SHARE = 0.02
+
+NATIONAL_COLUMNS = {
+    "Summe endverbrauchte Energie Regelblock Schweiz\nTotal energy consumed by end users in the Swiss controlblock": 0.93,
+    "Summe produzierte Energie Regelblock Schweiz\nTotal energy production Swiss controlblock": None,
+    "Summe verbrauchte Energie Regelblock Schweiz\nTotal energy consumption Swiss controlblock": 1.0,
+    "Netto Ausspeisung aus dem Übertragungsnetz Schweiz\nNet outflow of the Swiss transmission grid": 0.85,
+}
+
+
+def _season(index):
+    # +1 in mid-January (winter), -1 in mid-July (summer)
+    return np.cos(2 * np.pi * (index.dayofyear.to_numpy() - 15) / 365.25)
+
+
+def synthetic_cleaned_dataset(start=None, end=None, periods=None, freq="D", seed=0):
+    """
+    Rows of the cleaned dataset. `start`, `end`, `periods` and `freq` as in
+    pd.date_range; the published file has one row per week ("7D").
+    """
+    dates = pd.date_range(start=start, end=end, periods=periods, freq=freq)
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    s = _season(dates)
+    weekend = dates.dayofweek.to_numpy() >= 5
+
+    def noisy(mean, sd, low=0.0):
+        return np.maximum(mean + rng.normal(0, sd, n), low).round(1)
+
+    df = pd.DataFrame({"Datum": dates.strftime("%Y-%m-%d")})
+    df["Laufwerke"] = noisy(42 - 17 * s, 3)
+    df["Speicherwerke"] = noisy(70 + 10 * s, 18, low=5)
+    df["Total Hydraulisch"] = (df["Laufwerke"] + df["Speicherwerke"]).round(1)
+    # summer revisions show up as days with reduced nuclear output
+    outage = rng.random(n) < np.where(s < 0, 0.35, 0.05)
+    df["Kernkraftwerke"] = noisy(np.where(outage, 45, 70.5), 1.5)
+    df["Thermisch"] = noisy(10 + s, 0.6)
+    df["Windkraft"] = (rng.gamma(1.5, 0.35, n) * (1 + 0.4 * s)).round(1)
+    df["Photovoltaik"] = ((28 - 20 * s) * rng.uniform(0.25, 1.1, n)).round(1)
+    # "Total Erneuerbar" is the total production in the published file, nuclear included
+    df["Total Erneuerbar"] = df[
+        ["Total Hydraulisch", "Kernkraftwerke", "Thermisch", "Windkraft", "Photovoltaik"]
+    ].sum(axis=1).round(1)
+    df["Verbrauch Speicherpumpen"] = noisy(12 - 6 * s, 4, low=1)
+    df["Nettoerzeugung Total"] = (df["Total Erneuerbar"] - df["Verbrauch Speicherpumpen"]).round(1)
+
+    consumption = noisy((180 + 25 * s) * np.where(weekend, 0.88, 1.0), 6)
+    surplus = (consumption - df["Nettoerzeugung Total"]).round(1)
+    export = noisy(90 - 10 * s, 12, low=20)
+    # at least 20 GWh of imports, both directions are raised together
+    export = (export + np.maximum(20 - (export + surplus), 0)).round(1)
+    df["Einfuhr"] = (export + surplus).round(1)
+    df["Ausfuhr"] = export
+    df["Überschuss"] = surplus
+    df["Landesverbrauch"] = (df["Nettoerzeugung Total"] + df["Überschuss"]).round(1)
+
+    df["Mittlere Tagestemperatur"] = (10 - 9 * s + rng.normal(0, 3, n)).round(0)
+    # flow of the Rhine at Basel (m3/s) and in % of the long-term mean of the season
+    norm = 1100 - 360 * s
+    rhine = (norm * rng.lognormal(0, 0.25, n)).round(0)
+    df["Wasserführung Rhein"] = rhine
+    df["Wasserführung in %"] = (rhine / norm * 100).round(0)
+    return df[CLEANED_COLUMNS]
+
+
+def _canton_groups():
+    shared = {code for group in SHARED_CANTONS for code in group}
+    singles = [(code,) for code in sorted(PRODUCTION_SHARES) if code not in shared]
+    return sorted(singles + SHARED_CANTONS)
+
+
+def _canton_column(metric, group):
+    english = {"Produktion": "Production", "Verbrauch": "Consumption"}[metric]
+    codes = ", ".join(group)
+    if len(group) == 1:
+        return f"{metric} Kanton {codes}\n{english} Canton {codes}"
+    return f"{metric} Kantone {codes}\n{english} Cantons {codes}"
+
+
+def synthetic_timeseries_sheet(start=None, end=None, periods=None, freq="15min", seed=0):
+    """
+    Rows of the Zeitreihen0h15 sheet, units row first. `start`, `end`,
+    `periods` and `freq` as in pd.date_range (interval starts).
+    """
+    starts = pd.date_range(start=start, end=end, periods=periods, freq=freq)
+    rng = np.random.default_rng(seed)
+    n = len(starts)
+    s = _season(starts)
+    hour = starts.hour.to_numpy() + starts.minute.to_numpy() / 60
+    weekend = starts.dayofweek.to_numpy() >= 5
+    step = starts[1] - starts[0] if n > 1 else pd.Timedelta("15min")
+    # kWh per interval; national consumption is about 1.7 GWh per quarter hour
+    per_interval = step / pd.Timedelta("15min")
+
+    daily = 0.5 * (np.sin(np.pi * (hour - 6) / 12) + 1) * (hour >= 6) * (hour <= 22)
+    sun = np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None) * (1 - 0.5 * s) * rng.uniform(0.3, 1.0, n)
+
+    consumption = 1.7e6 * (1 + 0.15 * s) * (0.8 + 0.35 * daily) * np.where(weekend, 0.88, 1.0)
+    consumption *= rng.normal(1, 0.02, n) * per_interval
+    production = (
+        0.75e6 * (1 + 0.05 * s)
+        + 1.0e6 * (1 - 0.35 * s) * (0.8 + 0.4 * daily)
+        + 0.9e6 * sun
+        + 0.1e6
+    ) * rng.normal(1, 0.03, n) * per_interval
+
+    columns = {}
+    for name, share in NATIONAL_COLUMNS.items():
+        columns[name] = production if share is None else consumption * share
+
+    for metric, national, shares in (
+        ("Produktion", production * (1 - ACROSS_CANTONS_SHARE), PRODUCTION_SHARES),
+        ("Verbrauch", consumption, CONSUMPTION_SHARES),
+    ):
+        weights = np.array([sum(shares[code] for code in group) for group in _canton_groups()])
+        weights /= weights.sum()
+        noise = rng.normal(1, 0.05, (n, len(weights))).clip(0)
+        values = national[:, None] * weights[None, :] * noise
+        for group, column in zip(_canton_groups(), values.T):
+            columns[_canton_column(metric, group)] = column
+        if metric == "Produktion":
+            # not a canton column, the map ignores it like in the published sheet
+            columns["Produktion Kantonsübergreifend\nProduction across Cantons"] = production * ACROSS_CANTONS_SHARE
+
+    df = pd.DataFrame(columns).round(0)
+    df.insert(0, "Zeitstempel", (starts + step).strftime(TIMESTAMP_FORMAT))
+    units = pd.DataFrame([["Zeitstempel"] + ["kWh"] * (df.shape[1] - 1)], columns=df.columns)
+    return pd.concat([units, df], ignore_index=True)
+
+
+def write_timeseries_sheet(df_sheet, path):
+    """Write the sheet as .xlsx (sheet Zeitreihen0h15) or as CSV export, by suffix."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        df_sheet.to_csv(path, index=False)
+    else:
+        df_sheet.to_excel(path, sheet_name=SHEET_NAME, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, nargs="+", default=[2025], help="first (and last) year")
+    parser.add_argument("--resolution", default="15min", help="interval of the time series sheet")
+    parser.add_argument("--cleaned-resolution", default="7D", help="interval of the cleaned dataset")
+    parser.add_argument("--sheet-format", choices=("csv", "xlsx"), default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--only", choices=("cleaned", "timeseries"), default=None)
+    args = parser.parse_args(argv)
+
+    start, end = f"{args.years[0]}-01-01", f"{args.years[-1]}-12-31 23:59"
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    if args.only != "timeseries":
+        df = synthetic_cleaned_dataset(start, end, freq=args.cleaned_resolution, seed=args.seed)
+        df.to_csv(out / "cleaned_dataset.csv", index=False)
+        print(f"{out / 'cleaned_dataset.csv'}: {len(df)} rows")
+    if args.only != "cleaned":
+        df = synthetic_timeseries_sheet(start, end, freq=args.resolution, seed=args.seed)
+        path = write_timeseries_sheet(df, out / f"EnergieUebersichtCH-synthetic.{args.sheet_format}")
+        print(f"{path}: {len(df) - 1} rows")
+
+
+if __name__ == "__main__":
+    main()
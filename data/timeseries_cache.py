@@ -0,0 +1,175 @@
+"""Columnar cache for the 15-minute BFE time series (Zeitreihen0h15).
+
+Parsing the Excel sheet with openpyxl takes several seconds for a full year of
+15-minute rows. The sheet is converted once into a typed Parquet file that is
+keyed by the workbook's fingerprint, so later loads only read the Parquet file.
+Large workbooks are converted chunk by chunk. The file is written in row groups
+of about a month, so read_timeseries_window() only reads the row groups and
+columns of the requested window.
+
+One-time conversion:
+    python -m data.timeseries_cache data/raw/EnergieUebersichtCH-2025-2.xlsx
+"""
+import hashlib
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from data.stream_ingest import STREAMING_MIN_BYTES, iter_chunks
+
+CACHE_DIR = Path("data/processed/cache")
+TIMESTAMP_COL = "Zeitstempel"
+# about one month of 15-minute rows per Parquet row group
+ROW_GROUP_ROWS = 96 * 31
+
+
+def source_fingerprint(path):
+    # mtime + size is enough to detect a replaced workbook without hashing it
+    stat = Path(path).stat()
+    raw = f"{stat.st_mtime_ns}-{stat.st_size}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def _cache_prefix(path, sheet_name):
+    return f"{Path(path).stem}__{sheet_name}__"
+
+
+def cache_path(path, sheet_name, cache_dir=CACHE_DIR):
+    fingerprint = source_fingerprint(path)
+    return Path(cache_dir) / f"{_cache_prefix(path, sheet_name)}{fingerprint}.parquet"
+
+
+def _read_sheet(path, sheet_name):
+    # Row 1 holds the units (kWh), not data
+    if Path(path).suffix.lower() == ".csv":
+        # CSV export of the sheet, same layout
+        return pd.read_csv(path, skiprows=[1])
+    return pd.read_excel(path, sheet_name=sheet_name, skiprows=[1])
+
+
+def _apply_types(df):
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+
+    for col in df.columns:
+        if col == TIMESTAMP_COL:
+            df[col] = pd.to_datetime(df[col], dayfirst=True, errors="coerce")
+        else:
+            converted = pd.to_numeric(df[col], errors="coerce")
+            # keep text columns (e.g. comments) as strings instead of NaN
+            if converted.notna().any() or df[col].isna().all():
+                df[col] = converted.astype("float64")
+            else:
+                df[col] = df[col].astype("string")
+    return df
+
+
+def _conform(chunk, schema):
+    # later chunks get the column types of the first one
+    for field in schema:
+        if field.name == TIMESTAMP_COL or field.name not in chunk.columns:
+            continue
+        if str(field.type) == "double" and chunk[field.name].dtype != "float64":
+            chunk[field.name] = pd.to_numeric(chunk[field.name], errors="coerce").astype("float64")
+        elif str(field.type) == "string" and chunk[field.name].dtype != "string":
+            chunk[field.name] = chunk[field.name].astype("string")
+    return chunk
+
+
+def _write_streaming(path, sheet_name, target):
+    """Convert the sheet chunk by chunk, only one chunk is held in memory."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = schema = None
+    try:
+        for chunk in iter_chunks(path, sheet_name):
+            chunk = _apply_types(chunk)
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(target, schema)
+            else:
+                chunk = _conform(chunk, schema)
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            writer.write_table(table, row_group_size=ROW_GROUP_ROWS)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def convert_timeseries(path, sheet_name="Zeitreihen0h15", cache_dir=CACHE_DIR):
+    """Write the sheet to Parquet and remove outdated cache files of the same sheet."""
+    target = cache_path(path, sheet_name, cache_dir)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = target.with_suffix(".parquet.tmp")
+    if Path(path).stat().st_size >= STREAMING_MIN_BYTES:
+        _write_streaming(path, sheet_name, tmp)
+    else:
+        df = _apply_types(_read_sheet(path, sheet_name))
+        df.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_ROWS)
+    tmp.replace(target)
+
+    for stale in target.parent.glob(f"{_cache_prefix(path, sheet_name)}*.parquet"):
+        if stale != target:
+            stale.unlink(missing_ok=True)
+    return target
+
+
+def _fresh_cache(path, sheet_name, cache_dir):
+    """Path of the up-to-date Parquet file, converted if needed. None if it cannot be written."""
+    target = cache_path(path, sheet_name, cache_dir)
+    if target.exists():
+        return target
+    try:
+        return convert_timeseries(path, sheet_name, cache_dir)
+    except (ImportError, OSError):
+        # no parquet engine or read-only file system
+        return None
+
+
+def load_timeseries(path, sheet_name="Zeitreihen0h15", cache_dir=CACHE_DIR):
+    """Typed frame of the sheet, read from the Parquet cache when it is fresh."""
+    target = _fresh_cache(path, sheet_name, cache_dir)
+    if target is None:
+        return _apply_types(_read_sheet(path, sheet_name))
+    return pd.read_parquet(target)
+
+
+def timeseries_columns(path, sheet_name="Zeitreihen0h15", cache_dir=CACHE_DIR):
+    """Column names of the sheet, from the Parquet schema (no rows are read)."""
+    target = _fresh_cache(path, sheet_name, cache_dir)
+    if target is None:
+        return list(load_timeseries(path, sheet_name, cache_dir).columns)
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(target).names
+
+
+def read_timeseries_window(path, sheet_name="Zeitreihen0h15", start=None, end=None, columns=None, cache_dir=CACHE_DIR):
+    """
+    Rows with start <= Zeitstempel <= end (both optional) of `columns` (default:
+    all) plus Zeitstempel. Only the matching row groups and columns are read.
+    """
+    if columns is not None:
+        columns = [TIMESTAMP_COL] + [col for col in columns if col != TIMESTAMP_COL]
+    filters = []
+    if start is not None:
+        filters.append((TIMESTAMP_COL, ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append((TIMESTAMP_COL, "<=", pd.Timestamp(end)))
+
+    target = _fresh_cache(path, sheet_name, cache_dir)
+    if target is None:
+        df = load_timeseries(path, sheet_name, cache_dir)
+        mask = pd.Series(True, index=df.index)
+        for _, op, value in filters:
+            mask &= df[TIMESTAMP_COL] >= value if op == ">=" else df[TIMESTAMP_COL] <= value
+        return df.loc[mask, columns or df.columns].reset_index(drop=True)
+    return pd.read_parquet(target, columns=columns, filters=filters or None)
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["data/raw/EnergieUebersichtCH-2025-2.xlsx"]:
+        print(convert_timeseries(arg))
@@ -0,0 +1,26 @@
+import pandas as pd
+import streamlit as st
+
+from utils import instrumentation
+
+
+def render_debug_panel():
+    """Latest timing record per card and the averages of the recent runs (DASHBOARD_TIMING=1)."""
+    if not instrumentation.ENABLED:
+        return
+
+    with st.expander("Timing (debug)", expanded=False):
+        records = pd.DataFrame(list(instrumentation.recent))
+        if records.empty:
+            st.caption("Noch keine Messungen.")
+            return
+
+        columns = ["prep_s", "build_s", "total_s", "payload_bytes", "cache_hits", "cache_misses"]
+        st.markdown("**Letzter Lauf pro Karte**")
+        st.dataframe(records.groupby("card")[columns].last().round(4), use_container_width=True)
+
+        st.markdown(f"**Mittelwerte der letzten {len(records)} Läufe**")
+        summary = records.groupby("card")[columns].mean().round(4)
+        summary.insert(0, "runs", records.groupby("card").size())
+        st.dataframe(summary, use_container_width=True)
+        st.caption(f"Log: {instrumentation.LOG_PATH} · Prometheus: {instrumentation.METRICS_PATH}")
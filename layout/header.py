@@ -1,4 +1,4 @@
 import streamlit as st
 
 def render_header():
-    st.markdown("## Switzerlands Energy Dashboard 2025")
\ No newline at end of file
+    st.markdown(f"## Switzerlands Energy Dashboard {st.session_state.year}")
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""Entry points of the dashboard cards, imported on first use.
+
+`plots.plot_kantonskarte()` imports plots.geography (and with it folium and
+branca) only when the map card renders for the first time, the same for
+plotly.express, plotly.subplots and altair in the other cards. Keep the
+`import plots` style in app.py: `from plots import ...` at module level
+would import everything at startup again.
+
+    python -m benchmarks.importtime     # import cost per module
+"""
+import importlib
+
+# entry point -> module that defines it
+_ENTRY_POINTS = {
+    "plot_kpis": "plots.kpi",
+    "render_energy_kpis": "plots.kpi_with_icons",
+    "plot_kantonskarte": "plots.geography",
+    "temp_scatter": "plots.temperature_scatterplot",
+    "production_plots": "plots.production",
+    "plot_heatmap_import_export": "plots.heatmap",
+    "plot_time_series": "plots.timeseries",
+    "plot_high_res_time_series": "plots.timeseries",
+    "plotly_chart_cached": "plots.figure_cache",
+}
+
+__all__ = sorted(_ENTRY_POINTS)
+
+
+def __getattr__(name):
+    if name not in _ENTRY_POINTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_ENTRY_POINTS[name]), name)
+    # ab jetzt ein normales Modulattribut, __getattr__ wird nicht mehr gefragt
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ENTRY_POINTS))
@@ -1,9 +1,10 @@
 import calendar
 
-import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from data.aggregates import monthly_sums_by_month
+
 
 def _build_colorscale(colors):
     if len(colors) == 1:
@@ -13,20 +14,8 @@ def _build_colorscale(colors):
 
 
 def plot_heatmap_import_export(df_cleaned):
-    df = df_cleaned.copy()
-    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
-    df = df.dropna(subset=["Datum"])
-
-    monthly = (
-        df.groupby(df["Datum"].dt.month)[["Einfuhr", "Ausfuhr", "Landesverbrauch"]]
-        .sum()
-        .reset_index()
-        .rename(columns={"Datum": "Monat"})
-    )
-
+    monthly = monthly_sums_by_month(df_cleaned, ["Einfuhr", "Ausfuhr", "Landesverbrauch"])
     month_labels = [calendar.month_abbr[i] for i in range(1, 13)]
-    monthly = monthly.set_index("Monat")
-    monthly = monthly.reindex(range(1, 13)).fillna(0)
 
     data = monthly.rename(
         columns={
@@ -0,0 +1,282 @@
+"""Headless export of all dashboard figures into static files and one report.
+
+Every figure is built with the same build_* functions as the dashboard, for
+every month (production, canton map) and metric (canton map), in parallel
+across a process pool. A manifest keeps the content hash of every written
+file; figures whose content did not change are not rendered again, so the
+nightly run only pays for new data. With --year, every figure (production
+sums included) only shows that year.
+
+Plotly figures are written as PNG / SVG / PDF if kaleido is installed, Altair
+charts if vl-convert is installed; otherwise (and for the folium map) as
+standalone HTML. report.html links all outputs in one page.
+
+Run from the repository root:
+    python -m plots.export                           # exports/<year>/, PNG where possible
+    python -m plots.export --format svg --jobs 8 --year 2025
+    python -m plots.export --force                   # ignore the manifest
+"""
+import argparse
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+import streamlit.logger
+
+from data.canton_schema import CANTON_METRICS
+from data.load_data import CLEANED_DATASET_PATH, TIMESERIES_PATH, TIMESERIES_SHEET, load_prepared_dataset
+from data.production_data import MONTHLY_SUMS_PATH, fold_rows, monthly_sums_for_year
+
+EXPORT_DIR = "exports"
+GEOJSON_PATH = "data/geo/ch_cantons.geojson"
+MANIFEST = "manifest.json"
+FORMATS = ("png", "svg", "pdf", "html")
+
+SECTIONS = {
+    "production_bar": "Production",
+    "production_donut": "Production",
+    "kantonskarte": "Regional Analysis",
+    "temperature": "Impact of temperature",
+    "heatmap": "Import, Export and Consumption",
+    "time_series": "Time Series",
+}
+
+# folium gives every element a random id, they must not change the content hash
+_RANDOM_IDS = re.compile(r"[0-9a-f]{32}")
+
+
+@lru_cache(maxsize=None)
+def _cleaned(path, year):
+    return load_prepared_dataset(path, year=year)
+
+
+@lru_cache(maxsize=None)
+def _monthly(path, cleaned_path, year):
+    if year is None:
+        return pd.read_csv(path, dtype={"Monat": str})
+    # monthly_sums.csv holds one year without saying which ("Monat" is 01-12),
+    # so the sums of the requested year are built from the cleaned data
+    df = _cleaned(cleaned_path, year)
+    state = {"watermark": None, "partials": {}}
+    if not df.empty:
+        state = fold_rows(state, df)
+    return monthly_sums_for_year(state, year)
+
+
+def _production_sums(sources):
+    return _monthly(sources["monthly"], sources["cleaned"], sources["year"])
+
+
+def _build(job, sources):
+    """Figure of one job: a Plotly figure, an Altair chart, a folium map or None."""
+    # imported here so the parent process stays light
+    from plots.geography import build_kantonskarte_map
+    from plots.heatmap import build_heatmap_import_export_fig
+    from plots.production import build_production_bar_fig, build_production_donut_fig
+    from plots.temperature_scatterplot import temp_scatter
+    from plots.timeseries import build_time_series_fig
+
+    name, month, metric = job["name"], job.get("month"), job.get("metric")
+    if name == "production_bar":
+        return build_production_bar_fig(_production_sums(sources), height=400, selected_month=month)
+    if name == "production_donut":
+        return build_production_donut_fig(_production_sums(sources), height=400, selected_month=month)
+    if name == "kantonskarte":
+        m, _ = build_kantonskarte_map(
+            data_path=sources["timeseries"],
+            geojson_path=sources["geojson"],
+            sheet_name=sources["sheet"],
+            metric_label=metric,
+            feature_key=None,
+            selected_month=month,
+        )
+        return m
+
+    df = _cleaned(sources["cleaned"], sources["year"])
+    if name == "temperature":
+        return temp_scatter(df, width=1000, height=650)
+    if name == "heatmap":
+        return build_heatmap_import_export_fig(df, height=320)
+    if name == "time_series":
+        return build_time_series_fig(df, height=400)
+    raise ValueError(f"Unbekannte Grafik: {name}")
+
+
+def _content(fig):
+    if hasattr(fig, "get_root"):
+        return _RANDOM_IDS.sub("", fig.get_root().render())
+    return fig.to_json()
+
+
+def _engine_available(fig):
+    if hasattr(fig, "get_root"):
+        return False
+    module = "kaleido" if hasattr(fig, "write_image") else "vl_convert"
+    return importlib.util.find_spec(module) is not None
+
+
+def _write(fig, base, fmt):
+    """Write `fig` to base.<fmt>, or to base.html without an engine for the format."""
+    if fmt == "html" or not _engine_available(fig):
+        target = base.with_suffix(".html")
+        if hasattr(fig, "get_root"):
+            fig.save(str(target))
+        elif hasattr(fig, "write_html"):
+            # plotly.min.js once next to the files, the report works offline
+            fig.write_html(str(target), include_plotlyjs="directory")
+        else:
+            fig.save(str(target))
+        return target
+
+    target = base.with_suffix(f".{fmt}")
+    if hasattr(fig, "write_image"):
+        fig.write_image(str(target))
+    else:
+        fig.save(str(target))
+    return target
+
+
+def job_name(job):
+    parts = [job["name"], job.get("metric"), job.get("month")]
+    return "_".join(part for part in parts if part)
+
+
+def export_job(job, sources, out_dir, fmt, known_hash=None):
+    """Build one figure and write it unless its content hash is `known_hash`. Returns a manifest entry."""
+    fig = _build(job, sources)
+    if fig is None:
+        return {"job": job, "file": None, "hash": None, "status": "empty"}
+
+    digest = hashlib.sha1(f"{fmt}:{_content(fig)}".encode("utf-8")).hexdigest()
+    base = Path(out_dir) / job_name(job)
+    existing = [path for path in base.parent.glob(f"{base.name}.*") if path.suffix[1:] in FORMATS]
+    if digest == known_hash and existing:
+        return {"job": job, "file": existing[0].name, "hash": digest, "status": "unchanged"}
+
+    target = _write(fig, base, fmt)
+    return {"job": job, "file": target.name, "hash": digest, "status": "written"}
+
+
+def _month_options(sources):
+    from plots.geography import get_kantonskarte_month_options
+
+    map_months = []
+    if Path(sources["timeseries"]).exists() and Path(sources["geojson"]).exists():
+        map_months = get_kantonskarte_month_options(data_path=sources["timeseries"], sheet_name=sources["sheet"])
+    production_months = sorted(month for month in _production_sums(sources)["Monat"].unique() if month != "Total")
+    # ein Jahr ohne Daten bekommt keine leeren Produktionsgrafiken
+    if production_months:
+        production_months = ["Total"] + production_months
+    return production_months, map_months
+
+
+def plan_jobs(sources):
+    """Every (figure, month, metric) combination the dashboard can show."""
+    production_months, map_months = _month_options(sources)
+    jobs = [{"name": name} for name in ("temperature", "heatmap", "time_series")]
+    for month in production_months:
+        jobs.append({"name": "production_bar", "month": month})
+        jobs.append({"name": "production_donut", "month": month})
+    for metric in CANTON_METRICS:
+        for month in map_months:
+            jobs.append({"name": "kantonskarte", "metric": metric, "month": month})
+    return jobs
+
+
+def write_report(entries, out_dir, title):
+    """report.html with every output, grouped like the dashboard cards."""
+    sections = {}
+    for entry in entries:
+        if entry["file"]:
+            sections.setdefault(SECTIONS[entry["job"]["name"]], []).append(entry)
+
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{html.escape(title)}</title>",
+        "<style>body{font-family:sans-serif;background:#F3F2F1;margin:2rem}"
+        "figure{background:#fff;border:1px solid #111;border-radius:16px;padding:1rem;margin:0 0 1rem}"
+        "img,iframe{width:100%;border:0}iframe{height:520px}</style></head><body>",
+        f"<h1>{html.escape(title)}</h1>",
+    ]
+    for section, items in sections.items():
+        parts.append(f"<h2>{html.escape(section)}</h2>")
+        for entry in items:
+            src = html.escape(entry["file"])
+            caption = html.escape(job_name(entry["job"]))
+            if src.endswith(".html"):
+                element = f"<iframe src='{src}' loading='lazy'></iframe>"
+            elif src.endswith(".pdf"):
+                element = f"<a href='{src}'>{src}</a>"
+            else:
+                element = f"<img src='{src}' alt='{caption}'>"
+            parts.append(f"<figure>{element}<figcaption>{caption}</figcaption></figure>")
+    parts.append("</body></html>")
+
+    target = Path(out_dir) / "report.html"
+    target.write_text("\n".join(parts), encoding="utf-8")
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--year", type=int, default=None, help="defaults to all data")
+    parser.add_argument("--out", default=None, help=f"defaults to {EXPORT_DIR}/<year>")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="write every file, ignore the manifest")
+    parser.add_argument("--cleaned", default=CLEANED_DATASET_PATH)
+    parser.add_argument("--monthly", default=MONTHLY_SUMS_PATH, help="production sums without --year")
+    parser.add_argument("--timeseries", default=TIMESERIES_PATH)
+    parser.add_argument("--sheet", default=TIMESERIES_SHEET)
+    parser.add_argument("--geojson", default=GEOJSON_PATH)
+    args = parser.parse_args(argv)
+
+    # bare mode: no runtime warnings from the caches
+    streamlit.logger.set_log_level("error")
+
+    sources = {
+        "cleaned": args.cleaned,
+        "monthly": args.monthly,
+        "timeseries": args.timeseries,
+        "sheet": args.sheet,
+        "geojson": args.geojson,
+        "year": args.year,
+    }
+    out_dir = Path(args.out or Path(EXPORT_DIR) / str(args.year or "all"))
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest_path = out_dir / MANIFEST
+    manifest = {} if args.force or not manifest_path.exists() else json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    jobs = plan_jobs(sources)
+    if not Path(args.timeseries).exists():
+        print(f"Kantonskarte übersprungen, Daten nicht gefunden: {args.timeseries}")
+
+    calls = [(job, sources, out_dir, args.format, manifest.get(job_name(job), {}).get("hash")) for job in jobs]
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            entries = list(pool.map(export_job, *zip(*calls)))
+    else:
+        entries = [export_job(*call) for call in calls]
+
+    manifest_path.write_text(
+        json.dumps({job_name(e["job"]): e for e in entries}, indent=1, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    report = write_report(entries, out_dir, f"Energy Dashboard {args.year or ''}".strip())
+
+    counts = {}
+    for entry in entries:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    print(", ".join(f"{n} {status}" for status, n in sorted(counts.items())) + f" -> {report}")
+
+
+if __name__ == "__main__":
+    main()
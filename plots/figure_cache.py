@@ -0,0 +1,88 @@
+"""Process-wide cache of serialized figures.
+
+Figures are keyed on the builder, a fingerprint of the input frame and the
+builder arguments, and stored as JSON so repeat views (also from other
+sessions) skip building the figure and encoding it. Least recently used
+entries are evicted once the cache exceeds MAX_BYTES.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from data.load_data import frame_version
+from utils.instrumentation import add_payload, cache_hit, cache_miss, timed
+
+MAX_BYTES = 64 * 1024 * 1024
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_size = 0
+stats = {"hits": 0, "misses": 0}
+
+
+def _figure_to_json(fig):
+    # Plotly and Altair figures both provide to_json()
+    if isinstance(fig, tuple):
+        # several figures from one builder: JSON array, null for a missing figure
+        return "[" + ",".join("null" if part is None else part.to_json() for part in fig) + "]"
+    return fig.to_json()
+
+
+def figure_json(builder, df, **kwargs):
+    """JSON of builder(df, **kwargs), built only on a cache miss. None if the builder returns None.
+
+    A builder may return a tuple of figures, they are cached together as one JSON array.
+    """
+    global _size
+
+    key = (
+        builder.__module__,
+        builder.__qualname__,
+        frame_version(df),
+        tuple(sorted(kwargs.items())),
+    )
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            stats["hits"] += 1
+            cache_hit()
+            add_payload(len(_entries[key]))
+            return _entries[key]
+
+    cache_miss()
+    with timed("build"):
+        fig = builder(df, **kwargs)
+        payload = None if fig is None else _figure_to_json(fig)
+    add_payload(0 if payload is None else len(payload))
+
+    with _lock:
+        stats["misses"] += 1
+        if payload is None or len(payload) > MAX_BYTES or key in _entries:
+            return payload
+        _entries[key] = payload
+        _size += len(payload)
+        while _size > MAX_BYTES:
+            _, evicted = _entries.popitem(last=False)
+            _size -= len(evicted)
+    return payload
+
+
+def clear():
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
+
+
+def plotly_chart_cached(builder, df, use_container_width=True, **kwargs):
+    payload = figure_json(builder, df, **kwargs)
+    if payload is not None:
+        st.plotly_chart(json.loads(payload), use_container_width=use_container_width)
+
+
+def altair_chart_cached(builder, df, use_container_width=True, **kwargs):
+    payload = figure_json(builder, df, **kwargs)
+    if payload is not None:
+        st.vega_lite_chart(json.loads(payload), use_container_width=use_container_width)
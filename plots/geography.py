@@ -1,59 +1,49 @@
-import json
+import threading
 from pathlib import Path
 
 import folium
+import numpy as np
 import pandas as pd
 import streamlit as st
+import streamlit.components.v1 as components
 from branca.colormap import LinearColormap
 from folium.features import GeoJsonTooltip
-from streamlit_folium import st_folium
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+from data.canton_schema import CANTON_METRICS, build_canton_month_cube
+from data.geometry import geojson_version, load_canton_geometry, load_geojson
+from data.load_data import TIMESERIES_PATH, TIMESERIES_SHEET, load_timeseries_frame
+from data.stream_ingest import STREAMING_MIN_BYTES, stream_aggregate
+from data.timeseries_cache import source_fingerprint
+from utils.instrumentation import add_payload, cache_miss, timed
 
-@st.cache_data
-def _load_timeseries(path, sheet_name):
-    return pd.read_excel(path, sheet_name=sheet_name, skiprows=[1])
-
-
-def _extract_canton_codes(column_name, metric):
-    if "\n" in column_name:
-        column_name = column_name.split("\n", 1)[0].strip()
-
-    singular = f"{metric} Kanton "
-    plural = f"{metric} Kantone "
-
-    if column_name.startswith(singular):
-        return [column_name.replace(singular, "").strip()]
-    if column_name.startswith(plural):
-        tail = column_name.replace(plural, "").strip()
-        return [code.strip() for code in tail.split(",") if code.strip()]
-    return []
+GEOJSON_PATH = "data/geo/swissBOUNDARIES3D_1_3_TLM_KANTONSGEBIET.geojson"
 
 
-def _build_canton_totals(df, metric, split_mode):
-    totals = {}
-
-    candidate_cols = [
-        col for col in df.columns
-        if isinstance(col, str) and col.startswith(f"{metric} Kanton")
-    ]
-    candidate_cols += [
-        col for col in df.columns
-        if isinstance(col, str) and col.startswith(f"{metric} Kantone")
-    ]
-
-    for col in candidate_cols:
-        codes = _extract_canton_codes(col, metric)
-        if not codes:
-            continue
-
-        value = pd.to_numeric(df[col], errors="coerce").sum()
-        if split_mode == "equal" and len(codes) > 1:
-            value = value / len(codes)
-
-        for code in codes:
-            totals[code] = totals.get(code, 0) + value
+@st.cache_data
+def _load_canton_month_cube(path, sheet_name, split_mode, version):
+    cache_miss()
+    if Path(path).stat().st_size >= STREAMING_MIN_BYTES:
+        cube, _ = stream_aggregate(path, sheet_name, split_mode)
+        return cube
+    return build_canton_month_cube(load_timeseries_frame(path, sheet_name), split_mode)
+
+
+def _canton_totals_from_cube(cube, metric, selected_month):
+    m = CANTON_METRICS.index(metric)
+    if selected_month and selected_month != "Total":
+        if selected_month not in cube["months"]:
+            values = np.zeros(len(cube["cantons"]))
+        else:
+            values = cube["values"][m, cube["months"].index(selected_month)]
+    else:
+        values = cube["values"][m].sum(axis=0)
 
-    return pd.DataFrame({"Kanton": sorted(totals), "Wert": [totals[k] for k in sorted(totals)]})
+    mask = cube["present"][m]
+    return pd.DataFrame({
+        "Kanton": [code for code, keep in zip(cube["cantons"], mask) if keep],
+        "Wert": values[mask],
+    })
 
 
 def _guess_feature_key(geojson_obj):
@@ -102,74 +92,28 @@ def _map_codes_to_names(df):
     return df
 
 
-def _merge_geojson_by_property(geojson_obj, feature_key):
-    if not feature_key or not feature_key.startswith("properties."):
-        return geojson_obj
-
-    prop_key = feature_key.split(".", 1)[1]
-    merged = {}
-
-    for feat in geojson_obj.get("features", []):
-        props = feat.get("properties", {})
-        name = props.get(prop_key)
-        if not name:
-            continue
-
-        geom = feat.get("geometry", {})
-        geom_type = geom.get("type")
-        coords = geom.get("coordinates", [])
-        if geom_type == "Polygon":
-            polygons = [coords]
-        elif geom_type == "MultiPolygon":
-            polygons = coords
-        else:
-            continue
-
-        entry = merged.setdefault(
-            name,
-            {
-                "type": "Feature",
-                "properties": {prop_key: name},
-                "geometry": {"type": "MultiPolygon", "coordinates": []},
-            },
-        )
-        entry["geometry"]["coordinates"].extend(polygons)
-
-    return {"type": "FeatureCollection", "features": list(merged.values())}
-
-
 def get_kantonskarte_month_options(
-    data_path="data/raw/EnergieUebersichtCH-2025-2.xlsx",
-    sheet_name="Zeitreihen0h15",
+    data_path=TIMESERIES_PATH,
+    sheet_name=TIMESERIES_SHEET,
 ):
     data_file = Path(data_path)
     if not data_file.exists():
         return ["Total"]
 
-    df = _load_timeseries(str(data_file), sheet_name)
-    if "Zeitstempel" not in df.columns:
-        return ["Total"]
-
-    df["Zeitstempel"] = pd.to_datetime(df["Zeitstempel"], dayfirst=True, errors="coerce")
-    month_options = (
-        df["Zeitstempel"]
-        .dropna()
-        .dt.to_period("M")
-        .astype(str)
-        .unique()
-    )
-    month_options = sorted(month_options)
-    return ["Total"] + month_options
+    with timed("prep", cached=True):
+        cube = _load_canton_month_cube(str(data_file), sheet_name, "equal", source_fingerprint(data_file))
+    return ["Total"] + [month for month in cube["months"] if month]
 
 
 def build_kantonskarte_map(
-    data_path="data/raw/EnergieUebersichtCH-2025-2.xlsx",
-    geojson_path="data/geo/swissBOUNDARIES3D_1_3_TLM_KANTONSGEBIET.geojson",
-    sheet_name="Zeitreihen0h15",
+    data_path=TIMESERIES_PATH,
+    geojson_path=GEOJSON_PATH,
+    sheet_name=TIMESERIES_SHEET,
     metric_label="Produktion",
     split_mode="equal",
     feature_key="properties.NAME",
     selected_month="Total",
+    detail="medium",
 ):
     data_file = Path(data_path)
     if not data_file.exists():
@@ -179,25 +123,26 @@ def build_kantonskarte_map(
     if not geo_file.exists():
         return None, f"GeoJSON fehlt: {geo_file.as_posix()}"
 
-    df = _load_timeseries(str(data_file), sheet_name)
-    if "Zeitstempel" in df.columns:
-        df["Zeitstempel"] = pd.to_datetime(df["Zeitstempel"], dayfirst=True, errors="coerce")
-        if selected_month and selected_month != "Total":
-            df = df[df["Zeitstempel"].dt.to_period("M").astype(str) == selected_month]
-
-    totals = _build_canton_totals(df, metric_label, split_mode)
+    with timed("prep", cached=True):
+        cube = _load_canton_month_cube(str(data_file), sheet_name, split_mode, source_fingerprint(data_file))
+    totals = _canton_totals_from_cube(cube, metric_label, selected_month)
     totals = _map_codes_to_names(totals)
 
-    with geo_file.open("r", encoding="utf-8") as handle:
-        geojson_obj = json.load(handle)
-
-    feature_key = feature_key or _guess_feature_key(geojson_obj)
+    feature_key = feature_key or _guess_feature_key(load_geojson(geo_file))
     if not feature_key or not feature_key.startswith("properties."):
         return None, "GeoJSON-Feature-Key nicht erkannt."
 
-    geojson_obj = _merge_geojson_by_property(geojson_obj, feature_key)
-
     prop_key = feature_key.split(".", 1)[1]
+    geometry = load_canton_geometry(geo_file, prop_key, detail=detail)
+    # geometry is shared between sessions, only the properties are annotated per map
+    geojson_obj = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": dict(f["properties"]), "geometry": f["geometry"]}
+            for f in geometry["features"]
+        ],
+    }
+
     geo_names = {f.get("properties", {}).get(prop_key) for f in geojson_obj.get("features", [])}
     data_names = set(totals["Kanton"].unique())
     missing = sorted(n for n in data_names if n not in geo_names)
@@ -236,12 +181,14 @@ def build_kantonskarte_map(
     colormap.caption = f"{metric_label} (kWh)"
     colormap.add_to(m)
 
+    # resolve the fill colour once per feature, the style function only reads it
+    for feat in geojson_obj["features"]:
+        value = value_map.get(feat["properties"].get(prop_key))
+        feat["properties"]["fill"] = colormap(value) if value is not None else "#f2f2f2"
+
     def style_function(feature):
-        name = feature.get("properties", {}).get(prop_key)
-        value = value_map.get(name)
-        fill = colormap(value) if value is not None else "#f2f2f2"
         return {
-            "fillColor": fill,
+            "fillColor": feature["properties"]["fill"],
             "color": "#555555",
             "weight": 0.7,
             "fillOpacity": 0.85,
@@ -257,10 +204,117 @@ def build_kantonskarte_map(
     return m, warning
 
 
+@st.cache_resource(max_entries=128)
+def _render_kantonskarte_html(
+    data_path, geojson_path, sheet_name, metric_label, split_mode, feature_key,
+    selected_month, detail, data_version, geo_version,
+):
+    cache_miss()
+    m, warning = build_kantonskarte_map(
+        data_path=data_path,
+        geojson_path=geojson_path,
+        sheet_name=sheet_name,
+        metric_label=metric_label,
+        split_mode=split_mode,
+        feature_key=feature_key,
+        selected_month=selected_month,
+        detail=detail,
+    )
+    if not m:
+        return None, warning
+    return m.get_root().render(), warning
+
+
+def render_kantonskarte_html(
+    data_path=TIMESERIES_PATH,
+    geojson_path=GEOJSON_PATH,
+    sheet_name=TIMESERIES_SHEET,
+    metric_label="Produktion",
+    split_mode="equal",
+    feature_key="properties.NAME",
+    selected_month="Total",
+    detail="medium",
+):
+    """
+    Rendered map HTML and warning, shared by all sessions.
+    There are only a few (metric, month, split_mode) combinations, so each is
+    built once per data version and then served from memory.
+    """
+    data_file, geo_file = Path(data_path), Path(geojson_path)
+    if not data_file.exists() or not geo_file.exists():
+        # nothing to cache, build_kantonskarte_map returns the error message
+        _, warning = build_kantonskarte_map(data_path=data_path, geojson_path=geojson_path)
+        return None, warning
+    with timed("build", cached=True):
+        map_html, warning = _render_kantonskarte_html(
+            str(data_file), str(geo_file), sheet_name, metric_label, split_mode, feature_key,
+            selected_month, detail, source_fingerprint(data_file), geojson_version(geo_file),
+        )
+    add_payload(len(map_html or ""))
+    return map_html, warning
+
+
+def warm_kantonskarte_cache(
+    data_path=TIMESERIES_PATH,
+    geojson_path=GEOJSON_PATH,
+    sheet_name=TIMESERIES_SHEET,
+    feature_key="properties.NAME",
+    split_modes=("equal", "full"),
+):
+    """Render every month x metric x split mode combination ahead of the first request."""
+    months = get_kantonskarte_month_options(data_path=data_path, sheet_name=sheet_name)
+    for split_mode in split_modes:
+        for metric_label in CANTON_METRICS:
+            for month in months:
+                render_kantonskarte_html(
+                    data_path=data_path,
+                    geojson_path=geojson_path,
+                    sheet_name=sheet_name,
+                    metric_label=metric_label,
+                    split_mode=split_mode,
+                    feature_key=feature_key,
+                    selected_month=month,
+                )
+
+
+@st.cache_resource
+def _start_warmup(data_path, geojson_path, sheet_name, feature_key, split_modes, data_version, geo_version):
+    thread = threading.Thread(
+        target=warm_kantonskarte_cache,
+        args=(data_path, geojson_path, sheet_name, feature_key, split_modes),
+        name="kantonskarte-warmup",
+        daemon=True,
+    )
+    # Kontext des startenden Laufs mitgeben, sonst warnen die Cache-Aufrufe im Thread
+    add_script_run_ctx(thread, get_script_run_ctx())
+    thread.start()
+    return thread
+
+
+def start_kantonskarte_warmup(
+    data_path=TIMESERIES_PATH,
+    geojson_path=GEOJSON_PATH,
+    sheet_name=TIMESERIES_SHEET,
+    feature_key="properties.NAME",
+    split_modes=("equal",),
+):
+    """
+    Run warm_kantonskarte_cache() in a background thread, once per process and
+    data version. The caller does not wait, later requests find the maps rendered.
+    """
+    data_file, geo_file = Path(data_path), Path(geojson_path)
+    if not data_file.exists() or not geo_file.exists():
+        return None
+    return _start_warmup(
+        str(data_file), str(geo_file), sheet_name, feature_key, tuple(split_modes),
+        source_fingerprint(data_file), geojson_version(geo_file),
+    )
+
+
 def plot_kantonskarte(
-    data_path="data/raw/EnergieUebersichtCH-2025-2.xlsx",
-    geojson_path="data/geo/swissBOUNDARIES3D_1_3_TLM_KANTONSGEBIET.geojson",
-    sheet_name="Zeitreihen0h15",
+    data_path=TIMESERIES_PATH,
+    geojson_path=GEOJSON_PATH,
+    sheet_name=TIMESERIES_SHEET,
     metric_label="Produktion",
     split_mode="equal",
     feature_key="properties.NAME",
@@ -278,7 +332,7 @@ def plot_kantonskarte(
     )
 
 
-    m, warning = build_kantonskarte_map(
+    map_html, warning = render_kantonskarte_html(
         data_path=data_path,
         geojson_path=geojson_path,
         sheet_name=sheet_name,
@@ -287,10 +341,12 @@ def plot_kantonskarte(
         feature_key=feature_key,
         selected_month=selected_month,
     )
-    if not m:
+    if not map_html:
         st.info("Karte konnte nicht geladen werden.")
         return
     if warning:
         st.warning(warning)
 
-    st_folium(m, use_container_width=True, height=height)
\ No newline at end of file
+    components.html(map_html, height=height)
+    # die übrigen Monate und Kennzahlen im Hintergrund rendern, einmal pro Prozess
+    start_kantonskarte_warmup(data_path, geojson_path, sheet_name, feature_key, (split_mode,))
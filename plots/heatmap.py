@@ -1,25 +1,14 @@
 import calendar
 
 import altair as alt
-import pandas as pd
-import streamlit as st
 
+from data.aggregates import monthly_sums_by_month
+from plots.figure_cache import altair_chart_cached
 
-def build_heatmap_import_export_fig(df_cleaned, height=320):
-    df = df_cleaned.copy()
-    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
-    df = df.dropna(subset=["Datum"])
-
-    monthly = (
-        df.groupby(df["Datum"].dt.month)[["Einfuhr", "Ausfuhr", "Landesverbrauch"]]
-        .sum()
-        .reset_index()
-        .rename(columns={"Datum": "Monat"})
-    )
 
+def build_heatmap_import_export_fig(df_cleaned, height=320):
+    monthly = monthly_sums_by_month(df_cleaned, ["Einfuhr", "Ausfuhr", "Landesverbrauch"])
     month_labels = [calendar.month_abbr[i] for i in range(1, 13)]
-    monthly = monthly.set_index("Monat")
-    monthly = monthly.reindex(range(1, 13)).fillna(0)
 
     data = monthly.rename(
         columns={
@@ -82,5 +71,4 @@ def build_heatmap_import_export_fig(df_cleaned, height=320):
 
 
 def plot_heatmap_import_export(df_cleaned, height=320):
-    chart = build_heatmap_import_export_fig(df_cleaned, height=height)
-    st.altair_chart(chart, use_container_width=True)
+    altair_chart_cached(build_heatmap_import_export_fig, df_cleaned, height=height)
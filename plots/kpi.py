@@ -1,36 +1,29 @@
-import pandas as pd
 import streamlit as st
 
+from data.kpis import get_kpi_snapshot, kpi_value
+from data.load_data import ensure_prepared
 
-def _safe_numeric(series):
-    return pd.to_numeric(series, errors="coerce")
+
+def _summary_values(df, year):
+    snapshot = get_kpi_snapshot(df)
+    peak_date = kpi_value(snapshot, "production_peak_date", year, default=None)
+    return (
+        kpi_value(snapshot, "winter_consumption_mean", year),
+        kpi_value(snapshot, "summer_production_mean", year),
+        kpi_value(snapshot, "production_peak", year),
+        "–" if peak_date is None else peak_date.strftime("%d.%m"),
+    )
 
 
-def build_summary_kpis_html(df_cleaned):
-    df = df_cleaned.copy()
-    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
-    df = df.dropna(subset=["Datum"])
+def build_summary_kpis_html(df_cleaned, year=None):
+    df = ensure_prepared(df_cleaned)
 
     required = ["Landesverbrauch", "Nettoerzeugung Total"]
     missing = [col for col in required if col not in df.columns]
     if missing:
         return "<div style='color:#000000;'>KPIs: Spalten fehlen.</div>"
 
-    df["Landesverbrauch"] = _safe_numeric(df["Landesverbrauch"])
-    df["Nettoerzeugung Total"] = _safe_numeric(df["Nettoerzeugung Total"])
-
-    winter_months = {12, 1, 2}
-    summer_months = {6, 7, 8}
-
-    winter = df[df["Datum"].dt.month.isin(winter_months)]
-    summer = df[df["Datum"].dt.month.isin(summer_months)]
-
-    winter_avg = winter["Landesverbrauch"].mean()
-    summer_prod = summer["Nettoerzeugung Total"].mean()
-
-    peak_row = df.loc[df["Nettoerzeugung Total"].idxmax()]
-    peak_value = peak_row["Nettoerzeugung Total"]
-    peak_date = peak_row["Datum"].strftime("%d.%m")
+    winter_avg, summer_prod, peak_value, peak_date = _summary_values(df, year)
 
     cards = [
         ("Winterverbrauch (Ø)", f"{winter_avg:,.0f} GWh".replace(",", "'"), "#6F896F"),
@@ -74,10 +67,8 @@ def _summary_card(title, value, bg_color):
     )
 
 
-def plot_kpis(df_cleaned):
-    df = df_cleaned.copy()
-    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
-    df = df.dropna(subset=["Datum"])
+def plot_kpis(df_cleaned, year=None):
+    df = ensure_prepared(df_cleaned)
 
     required = ["Landesverbrauch", "Nettoerzeugung Total"]
     missing = [col for col in required if col not in df.columns]
@@ -85,21 +76,7 @@ def plot_kpis(df_cleaned):
         st.info("KPIs: Spalten fehlen: " + ", ".join(missing))
         return
 
-    df["Landesverbrauch"] = _safe_numeric(df["Landesverbrauch"])
-    df["Nettoerzeugung Total"] = _safe_numeric(df["Nettoerzeugung Total"])
-
-    winter_months = {12, 1, 2}
-    summer_months = {6, 7, 8}
-
-    winter = df[df["Datum"].dt.month.isin(winter_months)]
-    summer = df[df["Datum"].dt.month.isin(summer_months)]
-
-    winter_avg = winter["Landesverbrauch"].mean()
-    summer_prod = summer["Nettoerzeugung Total"].mean()
-
-    peak_row = df.loc[df["Nettoerzeugung Total"].idxmax()]
-    peak_value = peak_row["Nettoerzeugung Total"]
-    peak_date = peak_row["Datum"].strftime("%d.%m")
+    winter_avg, summer_prod, peak_value, peak_date = _summary_values(df, year)
 
     winter_text = f"{winter_avg:,.0f} GWh".replace(",", "'")
     summer_text = f"{summer_prod:,.0f} GWh".replace(",", "'")
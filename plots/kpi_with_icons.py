@@ -1,135 +1,108 @@
-import streamlit as st
-import streamlit.components.v1 as components
-
+import hashlib
+from functools import lru_cache
+from string import Template
 
-def compute_kpis(df_monthly_sums):
-    numeric_cols = [
-        "Nettoerzeugung Total",
-        "Landesverbrauch",
-        "Verbrauch Speicherpumpen",
-        "Ausfuhr",
-        "Einfuhr",
-        "Wasserführung Rhein",
-    ]
-
-    totals = df_monthly_sums[numeric_cols].sum()
+import streamlit as st
 
+from data.kpis import get_kpi_snapshot, kpi_row
+from utils.icons import svg_icon
+from utils.instrumentation import add_payload, timed
+
+
+# card title -> KPI in data.kpis
+ENERGY_KPIS = {
+    "Net production": "net_production",
+    "National consumption": "consumption",
+    "Pumped storage consumption": "pumped_storage",
+    "Export": "export",
+    "Import": "import",
+    "Rhine streamflow": "rhine_flow",
+}
+
+# card title -> (icon in utils.icons, icon color)
+KPI_ICONS = {
+    "Net production": ("bolt", "#F4B400"),                      # gelb
+    "National consumption": ("flag", "#F2994A"),                # orange
+    "Pumped storage consumption": ("water_drop", "#2D9CDB"),    # blau (wasser)
+    "Export": ("north_east", "#27AE60"),                        # grün
+    "Import": ("south_west", "#EB5757"),                        # rot
+    "Rhine streamflow": ("waves", "#2BB3B1"),                   # türkis
+}
+
+
+def compute_kpis(df_monthly_sums, year=None):
+    """Totals of `year` (default: latest year in the frame), read from the KPI snapshot."""
+    row = kpi_row(get_kpi_snapshot(df_monthly_sums), year)
     return {
-        "Net production": totals["Nettoerzeugung Total"],
-        "National consumption": totals["Landesverbrauch"],
-        "Pumped storage consumption": totals["Verbrauch Speicherpumpen"],
-        "Export": totals["Ausfuhr"],
-        "Import": totals["Einfuhr"],
-        "Rhine streamflow": totals["Wasserführung Rhein"],
+        title: row.get(name, {}).get("value") or 0.0
+        for title, name in ENERGY_KPIS.items()
     }
 
 
-def _kpi_card_html(icon, title, value, unit="GWh", icon_color="#111111"):
-    return f"""
-    <div style="
-        display:flex;
-        align-items:center;
-        gap:0.6rem;
-        padding:0.45rem 0.55rem;
-        border-radius:12px;
-        background:#FFFFFF;
-        border: 1px solid rgba(17,17,17,0.15);
-        border-color: #FFFFFF;
-        width:100%;
-        box-sizing:border-box;
-        min-height:64px;
-    ">
-        <span class="material-icons" style="
-            font-size:2rem;
-            width:1.8rem;
-            text-align:center;
-            color:{icon_color};
-            line-height:1;
-        ">{icon}</span>
-
-        <div style="min-width:0;">
-            <div style="
-                font-size:1rem;
-                font-weight:600;
-                color:#111111;
-                line-height:1.15;
-                white-space:normal;
-                overflow:visible;
-                text-overflow:unset;
-                word-break:break-word;
-            ">{title}</div>
-
-            <div style="
-                font-size:1rem;
-                color:#111111;
-                opacity:0.72;
-                line-height:1.15;
-                margin-top:0.15rem;
-            ">{value:.1f} {unit}</div>
-        </div>
-    </div>
-    """
-
-
-def render_energy_kpis(df_monthly_sums):
-    kpis = compute_kpis(df_monthly_sums)
-
-    icons = {
-        "Net production": "bolt",
-        "National consumption": "flag",
-        "Pumped storage consumption": "water_drop",
-        "Export": "north_east",
-        "Import": "south_west",
-        "Rhine streamflow": "waves",
-    }
-
-    icon_colors = {
-        "Net production": "#F4B400",              # gelb
-        "National consumption": "#F2994A",        # orange
-        "Pumped storage consumption": "#2D9CDB",  # blau (wasser)
-        "Export": "#27AE60",                      # grün
-        "Import": "#EB5757",                      # rot
-        "Rhine streamflow": "#2BB3B1",            # türkis
-    }
-
-    # HTML Grid für alle KPI-Cards (statt st.columns + markdown)
-    grid_html = f"""
-    <link href="https://fonts.googleapis.com/icon?family=Material+Icons" rel="stylesheet">
-
-    <style>
-    /* Streamlit nutzt standardmäßig "Source Sans Pro" (bzw. ähnliche System-Fonts).
-        Wir setzen das hier explizit, damit es gleich aussieht. */
-    * {{
-        font-family: "Source Sans Pro", -apple-system, BlinkMacSystemFont, "Segoe UI",
-                 Roboto, "Helvetica Neue", Arial, "Noto Sans", "Liberation Sans", sans-serif;
-    }}
-    </style>
-
-    <div style="
-        display:grid;
-        grid-template-columns: repeat(6, minmax(0, 1fr));
-        gap:0.6rem;
-        width:100%;
-    ">
-        {_kpi_card_html(icons["Net production"], "Net production", kpis["Net production"],
-                        icon_color=icon_colors["Net production"])}
-
-        {_kpi_card_html(icons["National consumption"], "National consumption", kpis["National consumption"],
-                        icon_color=icon_colors["National consumption"])}
-
-        {_kpi_card_html(icons["Pumped storage consumption"], "Pumped storage consumption", kpis["Pumped storage consumption"],
-                        icon_color=icon_colors["Pumped storage consumption"])}
-
-        {_kpi_card_html(icons["Export"], "Export", kpis["Export"],
-                        icon_color=icon_colors["Export"])}
-
-        {_kpi_card_html(icons["Import"], "Import", kpis["Import"],
-                        icon_color=icon_colors["Import"])}
-
-        {_kpi_card_html(icons["Rhine streamflow"], "Rhine streamflow", kpis["Rhine streamflow"],
-                        icon_color=icon_colors["Rhine streamflow"])}
-    </div>
-    """
-
-    # components.html rendert stabil (kein "als Text angezeigt")
-    components.html(grid_html, height=90, scrolling=False)
+def compute_kpi_deltas(df_monthly_sums, year=None):
+    """Change against the previous year in %, None without data of the previous year."""
+    row = kpi_row(get_kpi_snapshot(df_monthly_sums), year)
+    return {title: row.get(name, {}).get("delta_pct") for title, name in ENERGY_KPIS.items()}
+
+
+# Templates werden einmal beim Import kompiliert, pro Rerun nur noch substituiert.
+# Klassen mit "kpi-" Präfix, das HTML landet im DOM der App (kein iframe).
+_STYLE = """<style>
+.kpi-grid{display:grid;grid-template-columns:repeat(6,minmax(0,1fr));gap:0.6rem;width:100%}
+.kpi-card{display:flex;align-items:center;gap:0.6rem;padding:0.45rem 0.55rem;border-radius:12px;
+background:#FFFFFF;border:1px solid #FFFFFF;width:100%;box-sizing:border-box;min-height:64px}
+.kpi-icon{flex:none;width:1.8rem;display:flex;justify-content:center;line-height:1}
+.kpi-title{font-size:1rem;font-weight:600;color:#111111;line-height:1.15;word-break:break-word}
+.kpi-value{font-size:1rem;color:#111111;opacity:0.72;line-height:1.15;margin-top:0.15rem}
+.kpi-delta{font-size:0.8rem;color:#111111;opacity:0.6;line-height:1.15}
+</style>"""
+
+_CARD = Template(
+    '<div class="kpi-card"><div class="kpi-icon">$icon</div><div style="min-width:0;">'
+    '<div class="kpi-title">$title</div><div class="kpi-value">$value $unit</div>$delta</div></div>'
+)
+_DELTA = Template('<div class="kpi-delta">$arrow $value % vs. prev. year</div>')
+_GRID = Template('$style<div class="kpi-grid" data-kpi-hash="$hash">$cards</div>')
+
+_ICONS_SVG = {title: svg_icon(icon, color) for title, (icon, color) in KPI_ICONS.items()}
+
+
+def _delta_html(delta_pct):
+    if delta_pct is None:
+        return ""
+    return _DELTA.substitute(arrow="▲" if delta_pct >= 0 else "▼", value=f"{abs(delta_pct):.1f}")
+
+
+@lru_cache(maxsize=32)
+def _grid_html(cards):
+    """Grid of the (title, value, delta_pct) cards; the same values give the same, cached HTML."""
+    body = "".join(
+        _CARD.substitute(
+            icon=_ICONS_SVG[title],
+            title=title,
+            value=f"{value:.1f}",
+            unit="GWh",
+            delta=_delta_html(delta_pct),
+        )
+        for title, value, delta_pct in cards
+    )
+    content_hash = hashlib.sha1(body.encode("utf-8")).hexdigest()[:12]
+    return _GRID.substitute(style=_STYLE, hash=content_hash, cards=body)
+
+
+def build_energy_kpis_html(df_monthly_sums, year=None):
+    kpis = compute_kpis(df_monthly_sums, year)
+    deltas = compute_kpi_deltas(df_monthly_sums, year)
+    return _grid_html(tuple((title, kpis[title], deltas[title]) for title in ENERGY_KPIS))
+
+
+def render_energy_kpis(df_monthly_sums, year=None):
+    # st.html rendert direkt in die Seite, ohne iframe und ohne externen Icon-Font
+    with timed("build"):
+        grid_html = build_energy_kpis_html(df_monthly_sums, year)
+    add_payload(len(grid_html))
+    st.html(grid_html)
+
+
+def clear():
+    _grid_html.cache_clear()
@@ -1,8 +1,11 @@
 import calendar
+import json
+
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
+from plots.figure_cache import figure_json
 from utils.colors import ENERGY_COLORS
 
 
@@ -16,116 +19,148 @@ ENERGY_SOURCES = [
 ]
 
 
+MONTH_MAP = {f"{i:02d}": calendar.month_name[i] for i in range(1, 13)}
+MONTH_MAP["Total"] = "Total"
+
+
+def _month_name(selected_month):
+    # Convert selected_month Zahl (z.B. "01") in Namen (z.B. "January")
+    return MONTH_MAP.get(selected_month, selected_month)
+
+
+def production_matrix(df_monthly):
+    """Monthly sums as month key ("01" ... "12", "Total") x energy source, prepared once for both figures."""
+    matrix = df_monthly[ENERGY_SOURCES].copy()
+    matrix.index = pd.Index(df_monthly["Monat"], name="Monat")
+    return matrix
+
+
+def _bar_fig(matrix, height, selected_month):
+    matrix = matrix[matrix.index != "Total"]
+    month_names = matrix.index.map(MONTH_MAP)
+
+    if selected_month != "Total":
+        keep = month_names == selected_month
+        matrix, month_names = matrix[keep], month_names[keep]
+
+    fig_bar = go.Figure()
+
+    for src in ENERGY_SOURCES:
+        fig_bar.add_trace(
+            go.Bar(
+                x=month_names,
+                y=matrix[src],
+                name=src,
+                marker_color=ENERGY_COLORS.get(src),
+            )
+        )
+
+    fig_bar.update_layout(
+        height=height,
+        barmode="stack",
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis_title=None,
+        yaxis_title="GWh",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+            font=dict(size=10),
+        ),
+    )
+    return fig_bar
+
+
+def _donut_fig(matrix, height, selected_month):
+    if selected_month == "Total":
+        rows = matrix[matrix.index == "Total"]
+    else:
+        rows = matrix[matrix.index != "Total"]
+        rows = rows[rows.index.map(MONTH_MAP) == selected_month]
+
+    if rows.empty:
+        return None
+
+    # Werte der ersten passenden Zeile
+    donut_df = pd.DataFrame(
+        {
+            "Energiequelle": ENERGY_SOURCES,
+            "Wert": rows.iloc[0].tolist(),
+        }
+    )
+
+    fig_donut = px.pie(
+        donut_df,
+        names="Energiequelle",
+        values="Wert",
+        hole=0.6,
+        color="Energiequelle",
+        color_discrete_map=ENERGY_COLORS,
+    )
+
+    fig_donut.update_layout(
+        height=height,
+        margin=dict(l=10, r=10, t=10, b=10),
+        showlegend=False,
+    )
+
+    fig_donut.update_traces(
+        textposition="inside",
+        textinfo="percent",
+        hovertemplate="<b>%{label}</b><br>%{value:.1f} GWh<extra></extra>",
+    )
+    return fig_donut
+
+
+def build_production_figs(df_monthly, height=220, selected_month="Total"):
+    """(bar, donut) of the selected month from one prepared matrix. The donut is None if there is no data."""
+    matrix = production_matrix(df_monthly)
+    selected_month = _month_name(selected_month)
+    return _bar_fig(matrix, height, selected_month), _donut_fig(matrix, height, selected_month)
+
+
+def build_production_bar_fig(df_monthly, height=220, selected_month="Total"):
+    return _bar_fig(production_matrix(df_monthly), height, _month_name(selected_month))
+
+
+def build_production_donut_fig(df_monthly, height=220, selected_month="Total"):
+    """Donut of the selected month, None if there is no data for it."""
+    return _donut_fig(production_matrix(df_monthly), height, _month_name(selected_month))
+
+
 def production_plots(
     df_monthly,
     height=220,
     selected_month="Total",
     show_bar=True,
     show_donut=True,
+    columns=None,
 ):
     """
     Flexible production plot renderer.
-    Can render stacked bar, donut, or both depending on flags.
+    Can render stacked bar, donut, or both depending on flags. Both figures
+    come from one cached build_production_figs() call per month; `columns`
+    (bar container, donut container) places them side by side.
     """
-
-    df = df_monthly.copy()
-
-    # -----------------------------
-    # Month mapping: Zahl → Name
-    # -----------------------------
-    month_map = {f"{i:02d}": calendar.month_name[i] for i in range(1, 13)}
-    month_map["Total"] = "Total"
-
-    # Convert selected_month Zahl (z.B. "01") in Namen (z.B. "January")
-    if selected_month in month_map:
-        selected_month = month_map[selected_month]
+    bar_container, donut_container = columns or (st.container(), st.container())
+    payload = figure_json(build_production_figs, df_monthly, height=height, selected_month=selected_month)
+    fig_bar, fig_donut = json.loads(payload)
 
     # -----------------------------
     # BAR CHART (stacked)
     # -----------------------------
     if show_bar:
-        df_bar = df[df["Monat"] != "Total"].copy()
-        df_bar["Monat_Name"] = df_bar["Monat"].map(month_map)
-
-        if selected_month != "Total":
-            df_bar = df_bar[df_bar["Monat_Name"] == selected_month]
-
-        fig_bar = go.Figure()
-
-        for src in ENERGY_SOURCES:
-            fig_bar.add_trace(
-                go.Bar(
-                    x=df_bar["Monat_Name"],
-                    y=df_bar[src],
-                    name=src,
-                    marker_color=ENERGY_COLORS.get(src),
-                )
-            )
-
-        fig_bar.update_layout(
-            height=height,
-            barmode="stack",
-            margin=dict(l=10, r=10, t=10, b=10),
-            xaxis_title=None,
-            yaxis_title="GWh",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-                font=dict(size=10),
-            ),
-        )
-
-        st.plotly_chart(fig_bar, use_container_width=True)
+        with bar_container:
+            st.plotly_chart(fig_bar, use_container_width=True)
 
     # -----------------------------
     # DONUT CHART
     # -----------------------------
     if show_donut:
-        if selected_month == "Total":
-            df_donut = df[df["Monat"] == "Total"]
-        else:
-            df_donut = df[df["Monat"] != "Total"].copy()
-            df_donut["Monat_Name"] = df_donut["Monat"].map(month_map)
-            df_donut = df_donut[df_donut["Monat_Name"] == selected_month]
-
-        if df_donut.empty:
-            st.warning("No data available for selected month.")
-            return
-
-        # Werte der einen Zeile extrahieren (nur wenn genau eine Zeile da ist)
-        row = df_donut.iloc[0]
-        values = [row[src] for src in ENERGY_SOURCES]
-
-        donut_df = pd.DataFrame(
-            {
-                "Energiequelle": ENERGY_SOURCES,
-                "Wert": values,
-            }
-        )
-
-        fig_donut = px.pie(
-            donut_df,
-            names="Energiequelle",
-            values="Wert",
-            hole=0.6,
-            color="Energiequelle",
-            color_discrete_map=ENERGY_COLORS,
-        )
-
-        fig_donut.update_layout(
-            height=height,
-            margin=dict(l=10, r=10, t=10, b=10),
-            showlegend=False,
-        )
-
-        fig_donut.update_traces(
-            textposition="inside",
-            textinfo="percent",
-            hovertemplate="<b>%{label}</b><br>%{value:.1f} GWh<extra></extra>",
-        )
-
-        st.plotly_chart(fig_donut, use_container_width=True)
-
+        with donut_container:
+            if fig_donut is None:
+                st.warning("No data available for selected month.")
+                return
+            st.plotly_chart(fig_donut, use_container_width=True)
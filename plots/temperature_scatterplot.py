@@ -5,6 +5,8 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
+from utils.stats import get_scatter_stats
+
 # importing color codes
 from utils.colors import (
     LANDESVERBRAUCH,
@@ -25,33 +27,28 @@ def temp_scatter(
     compact=False,
     show_controls=True,
     show_legend=True,
+    legend_mode="server",
+    gl_threshold=5_000,
+    density_threshold=100_000,
 ) -> go.Figure:
     axis_lw = 1.5 if compact else 2
-    # Assigning column names
-    x = df["Mittlere Tagestemperatur"]
-    y_consumption = df["Landesverbrauch"]
-    y_rhine = df["Wasserführung Rhein"]
-
-    # Assigning outliers
-    cons_outlier_mask = y_consumption > y_consumption.quantile(0.95)
-    rhine_outlier_mask = y_rhine < y_rhine.quantile(0.05)  # low-flow outliers
+    # WebGL markers above gl_threshold rows, density contours above density_threshold
+    n_points = len(df)
+    scalable = n_points > gl_threshold
+    point_trace = go.Scattergl if scalable else go.Scatter
 
-    # Assigning Trend lines
-    coef_cons = np.polyfit(x, y_consumption, 1)
-    coef_rhine = np.polyfit(x, y_rhine, 1)
-
-    x_trend = np.linspace(x.min(), x.max(), 50)
-    y_trend_cons = np.polyval(coef_cons, x_trend)
-    y_trend_rhine = np.polyval(coef_rhine, x_trend)
+    # Outliers and trend lines, precomputed once per data version
+    cons = get_scatter_stats(df, "Mittlere Tagestemperatur", "Landesverbrauch", upper_q=0.95)
+    rhine = get_scatter_stats(df, "Mittlere Tagestemperatur", "Wasserführung Rhein", lower_q=0.05)  # low-flow outliers
 
     # Creating figure with secondary y-axis
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
     # Scatter dots: Landesverbrauch (coloured)
     fig.add_trace(
-        go.Scatter(
-            x=x[~cons_outlier_mask],
-            y=y_consumption[~cons_outlier_mask],
+        point_trace(
+            x=cons["x_inliers"],
+            y=cons["y_inliers"],
             mode="markers",
             name="Landesverbrauch",
             marker=dict(
@@ -71,9 +68,9 @@ def temp_scatter(
 
     # Scatter dots: Landesverbrauch (grey background when off)
     fig.add_trace(
-        go.Scatter(
-            x=x[~cons_outlier_mask],
-            y=y_consumption[~cons_outlier_mask],
+        point_trace(
+            x=cons["x_inliers"],
+            y=cons["y_inliers"],
             mode="markers",
             name="Landesverbrauch (grau)",
             # legendgroup="cons",
@@ -86,9 +83,9 @@ def temp_scatter(
 
     # Scatter dots: Wasserführung Rhein (coloured)
     fig.add_trace(
-        go.Scatter(
-            x=x[~rhine_outlier_mask],
-            y=y_rhine[~rhine_outlier_mask],
+        point_trace(
+            x=rhine["x_inliers"],
+            y=rhine["y_inliers"],
             mode="markers",
             name="Wasserführung Rhein",
             marker=dict(
@@ -108,9 +105,9 @@ def temp_scatter(
 
     # Scatter dots: Wasserführung Rhein (grey when off)
     fig.add_trace(
-        go.Scatter(
-            x=x[~rhine_outlier_mask],
-            y=y_rhine[~rhine_outlier_mask],
+        point_trace(
+            x=rhine["x_inliers"],
+            y=rhine["y_inliers"],
             mode="markers",
             name="Wasserführung Rhein (grau)",
             # legendgroup="rhine",
@@ -124,8 +121,8 @@ def temp_scatter(
     # Trendline: Landesverbrauch
     fig.add_trace(
         go.Scatter(
-            x=x_trend,
-            y=y_trend_cons,
+            x=cons["trend_x"],
+            y=cons["trend_y"],
             mode="lines",
             name="Trend (Landesverbrauch)",
             # legendgroup="trend",
@@ -138,8 +135,8 @@ def temp_scatter(
     # Trendline: Wasserführung Rhein
     fig.add_trace(
         go.Scatter(
-            x=x_trend,
-            y=y_trend_rhine,
+            x=rhine["trend_x"],
+            y=rhine["trend_y"],
             mode="lines",
             name="Trend (Wasserführung Rhein)",
             # legendgroup="trend",
@@ -151,9 +148,9 @@ def temp_scatter(
 
     # Outliers: Landesverbrauch
     fig.add_trace(
-        go.Scatter(
-            x=x[cons_outlier_mask],
-            y=y_consumption[cons_outlier_mask],
+        point_trace(
+            x=cons["x_outliers"],
+            y=cons["y_outliers"],
             mode="markers",
             name="Ausreisser Landesverbrauch",
             legendgroup="outliers",
@@ -171,9 +168,9 @@ def temp_scatter(
 
     # Outliers: Wasserführung Rhein
     fig.add_trace(
-        go.Scatter(
-            x=x[rhine_outlier_mask],
-            y=y_rhine[rhine_outlier_mask],
+        point_trace(
+            x=rhine["x_outliers"],
+            y=rhine["y_outliers"],
             mode="markers",
             name="Ausreisser Rhein",
             legendgroup="outliers",
@@ -188,6 +185,15 @@ def temp_scatter(
         ),
         secondary_y=True)  # trace 7
 
+    if scalable:
+        # drop the grey copies (traces 1 and 3), the toggles restyle the originals instead
+        fig.data = [fig.data[i] for i in (0, 2, 4, 5, 6, 7)]
+        ids = SCALABLE_TRACE_IDS
+        if n_points > density_threshold:
+            _use_density_contours(fig, ids, cons, rhine)
+    else:
+        ids = TRACE_IDS
+
     # Axes styling (x, and 2 y axes) - dual
 
     # average daily temperature axis (x-axis)
@@ -290,8 +296,7 @@ def temp_scatter(
                 dict(
                     label="Landesverbrauch" + "\u00A0"*4,
                     method="restyle",
-                    args=[{"opacity": [1.0, 0.0]}, [0, 1]],
-                    args2=[{"opacity": [0.0, 0.35]}, [0, 1]],
+                    **_series_toggle_args(fig, ids, "cons", LANDESVERBRAUCH),
                 )
             ],
         ),
@@ -308,8 +313,7 @@ def temp_scatter(
                 dict(
                     label="Wasserführung Rhein",
                     method="restyle",
-                    args=[{"opacity": [1.0, 0.0]}, [2, 3]],
-                    args2=[{"opacity": [0.0, 0.35]}, [2, 3]],
+                    **_series_toggle_args(fig, ids, "rhine", WASSERFUEHRUNG),
                 )
             ],
         ),
@@ -326,8 +330,8 @@ def temp_scatter(
                 dict(
                     label="Trendlinien" + "\u00A0"*8,
                     method="restyle",
-                    args=[{"opacity": [1.0, 1.0]}, [4, 5]],
-                    args2=[{"opacity": [0.0, 0.0]}, [4, 5]],
+                    args=[{"opacity": [1.0, 1.0]}, [ids["trend_cons"], ids["trend_rhine"]]],
+                    args2=[{"opacity": [0.0, 0.0]}, [ids["trend_cons"], ids["trend_rhine"]]],
                 )
             ],
         ),
@@ -344,8 +348,8 @@ def temp_scatter(
                 dict(
                     label="Ausreisser" + "\u00A0"*9,
                     method="restyle",
-                    args=[{"opacity": [1.0, 1.0]}, [6, 7]],
-                    args2=[{"opacity": [0.0, 0.0]}, [6, 7]],
+                    args=[{"opacity": [1.0, 1.0]}, [ids["out_cons"], ids["out_rhine"]]],
+                    args2=[{"opacity": [0.0, 0.0]}, [ids["out_cons"], ids["out_rhine"]]],
                 )
             ],
         ),
@@ -369,4 +373,113 @@ def temp_scatter(
         layout_kwargs["height"] = height
 
     fig.update_layout(**layout_kwargs)
-    return fig
\ No newline at end of file
+
+    if legend_mode == "client":
+        _use_client_legend(fig, compact, ids)
+    return fig
+
+
+# Trace index per series, with and without the grey copies
+TRACE_IDS = {
+    "cons": 0, "cons_grey": 1, "rhine": 2, "rhine_grey": 3,
+    "trend_cons": 4, "trend_rhine": 5, "out_cons": 6, "out_rhine": 7,
+}
+SCALABLE_TRACE_IDS = {
+    "cons": 0, "rhine": 1, "trend_cons": 2, "trend_rhine": 3, "out_cons": 4, "out_rhine": 5,
+}
+
+# Legend labels of the dashboard card
+CLIENT_LEGEND_LABELS = {
+    "cons": "National consumption",
+    "rhine": "Rhine river flow",
+    "trend_cons": "Trend line (national consumption)",
+    "trend_rhine": "Trend line (Rhine river flow)",
+    "out_cons": "Outliers - national consumption",
+    "out_rhine": "Outliers - Rhine",
+}
+
+
+def _series_toggle_args(fig, ids, series, color):
+    """Restyle arguments of a series toggle button (on = args, off = args2)."""
+    grey = f"{series}_grey"
+    if grey in ids:
+        traces = [ids[series], ids[grey]]
+        return dict(args=[{"opacity": [1.0, 0.0]}, traces], args2=[{"opacity": [0.0, 0.35]}, traces])
+
+    idx = ids[series]
+    if fig.data[idx].type == "contour":
+        return dict(args=[{"opacity": [1.0]}, [idx]], args2=[{"opacity": [0.25]}, [idx]])
+    # grey out the coloured markers instead of swapping to a grey copy
+    return dict(args=[{"marker.color": [color]}, [idx]], args2=[{"marker.color": [GRAU]}, [idx]])
+
+
+def _use_density_contours(fig, ids, cons, rhine, bins=60):
+    """
+    Replace the point clouds by density contour lines, the outliers stay as points.
+    The 2D histogram is binned here, so only bins x bins counts are sent to the browser.
+    """
+    for series, stats, color in (
+        ("cons", cons, LANDESVERBRAUCH),
+        ("rhine", rhine, WASSERFUEHRUNG),
+    ):
+        old = fig.data[ids[series]]
+        counts, x_edges, y_edges = np.histogram2d(stats["x_inliers"], stats["y_inliers"], bins=bins)
+        contour = go.Contour(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=counts.T,
+            name=old.name,
+            xaxis=old.xaxis,
+            yaxis=old.yaxis,
+            colorscale=[(0, color), (1, color)],
+            contours=dict(coloring="lines"),
+            line=dict(width=1),
+            ncontours=8,
+            showscale=False,
+            hoverinfo="skip",
+        )
+        # figures only accept new traces through add_trace: append, then move into place
+        fig.add_trace(contour)
+        order = list(fig.data[:-1])
+        order[ids[series]] = fig.data[-1]
+        fig.data = order
+
+
+def _use_client_legend(fig, compact, ids):
+    """
+    Let the Plotly legend toggle the traces in the browser (no server rerun).
+
+    The grey copies (traces 1 and 3) are kept permanently visible underneath
+    their coloured series. Hiding a coloured series via the legend uncovers
+    the grey points, like the "off" state of the restyle buttons. Without grey
+    copies (large datasets) hiding a series removes it completely.
+    """
+    for series, label in CLIENT_LEGEND_LABELS.items():
+        fig.data[ids[series]].update(name=label, showlegend=True, legendgroup=None, visible=True)
+
+    if "cons_grey" in ids:
+        for series in ("cons_grey", "rhine_grey"):
+            fig.data[ids[series]].update(opacity=0.35, hoverinfo="skip", visible=True)
+
+        # draw the grey copies first so the coloured points cover them
+        fig.data = [fig.data[1], fig.data[3], fig.data[0], fig.data[2]] + list(fig.data[4:])
+
+    # the legend replaces the restyle buttons, whose trace indices no longer apply
+    fig.layout.updatemenus = []
+    fig.layout.shapes = []
+
+    fig.update_layout(
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            x=0,
+            y=1.02,
+            xanchor="left",
+            yanchor="bottom",
+            groupclick="toggleitem",
+            bgcolor=LEGENDE_HINTERGRUND,
+            font=dict(size=10 if compact else 13),
+        ),
+    )
+    if compact:
+        fig.update_layout(margin=dict(l=60, r=90, t=90, b=70))
\ No newline at end of file
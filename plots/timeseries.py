@@ -1,12 +1,24 @@
+from pathlib import Path
+
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
+from data.aggregates import monthly_sums_by_date
+from data.load_data import (
+    TIMESERIES_PATH,
+    TIMESERIES_SHEET,
+    ensure_prepared,
+    load_timeseries_index,
+    load_timeseries_window,
+)
+from data.stream_ingest import national_columns
+from plots.figure_cache import plotly_chart_cached
+from utils.downsampling import downsample
+
 
 def build_time_series_fig(df_cleaned, height=320):
-    df = df_cleaned.copy()
-    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
-    df = df.dropna(subset=["Datum"])
+    df = ensure_prepared(df_cleaned)
 
     metrics = {
         "Einfuhr": "Import",
@@ -19,10 +31,7 @@ def build_time_series_fig(df_cleaned, height=320):
         st.info("Zeitverlauf: Spalten fehlen: " + ", ".join(missing))
         return
 
-    df = df.set_index("Datum")
-    monthly = df[list(metrics.keys())].resample("M").sum()
-    monthly = monthly.reindex(pd.date_range(monthly.index.min(), monthly.index.max(), freq="M"))
-    monthly = monthly.fillna(0)
+    monthly = monthly_sums_by_date(df, list(metrics.keys()))
     month_labels = [d.strftime("%b") for d in monthly.index]
 
     palette = [
@@ -65,5 +74,102 @@ def build_time_series_fig(df_cleaned, height=320):
 
 
 def plot_time_series(df_cleaned, height=320):
-    fig = build_time_series_fig(df_cleaned, height=height)
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart_cached(build_time_series_fig, df_cleaned, height=height)
+
+
+def build_high_res_time_series_fig(
+    df_ts,
+    start=None,
+    end=None,
+    columns=None,
+    width_px=1200,
+    method="lttb",
+    height=320,
+):
+    """
+    15-minute national series between `start` and `end`, downsampled to about
+    one point per pixel of `width_px` (LTTB or min/max buckets).
+    """
+    stamps = df_ts["Zeitstempel"]
+    mask = stamps.notna()
+    if start is not None:
+        mask &= stamps >= pd.Timestamp(start)
+    if end is not None:
+        mask &= stamps <= pd.Timestamp(end)
+
+    columns = list(columns) if columns else national_columns(df_ts.columns)
+    x_all = stamps[mask].to_numpy()
+
+    palette = ["#83686F", "#A76E7D", "#E18262", "#F69E6C", "#FCC88A", "#8096AD"]
+
+    fig = go.Figure()
+    for idx, col in enumerate(columns):
+        x, y = downsample(x_all, df_ts.loc[mask, col].to_numpy(dtype="float64"), width_px, method)
+        label = col.split("\n", 1)[0]
+        fig.add_trace(
+            go.Scattergl(
+                x=x,
+                y=y,
+                name=label,
+                mode="lines",
+                line={"color": palette[idx % len(palette)], "width": 1},
+                hovertemplate=f"{label}: %{{y:,.0f}} kWh<extra></extra>",
+            )
+        )
+
+    fig.update_layout(
+        yaxis_title="kWh",
+        hovermode="x unified",
+        margin={"l": 10, "r": 10, "t": 40, "b": 10},
+        height=height,
+        plot_bgcolor="#FFFFFF",
+        paper_bgcolor="#FFFFFF",
+        legend={"orientation": "h", "y": 1.02, "yanchor": "bottom", "font": {"size": 10}},
+    )
+    return fig
+
+
+def plot_high_res_time_series(
+    data_path=TIMESERIES_PATH,
+    sheet_name=TIMESERIES_SHEET,
+    height=320,
+    width_px=1200,
+    method="lttb",
+):
+    """
+    Zoomable 15-minute view. Plotly zoom events do not reach the server, so the
+    range slider selects the window and the server re-downsamples it at full detail.
+    Only the rows of the window and the national columns are read from the
+    Parquet cache, the sheet is never loaded whole.
+    """
+    if not Path(data_path).exists():
+        st.info(f"15-Minuten-Daten nicht gefunden: {Path(data_path).as_posix()}")
+        return
+
+    (first, last), sheet_columns = load_timeseries_index(data_path, sheet_name)
+    if first is None:
+        st.info("15-Minuten-Daten ohne Zeitstempel.")
+        return
+
+    first, last = first.to_pydatetime(), last.to_pydatetime()
+    start, end = st.slider(
+        "Zeitraum",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        step=pd.Timedelta(minutes=15).to_pytimedelta(),
+        format="DD.MM.YYYY HH:mm",
+        label_visibility="collapsed",
+        key="ts_range",
+    )
+    # nur das gewählte Fenster und die nationalen Spalten lesen, nie das ganze Blatt
+    df_window = load_timeseries_window(
+        data_path, sheet_name, start=start, end=end, columns=national_columns(sheet_columns)
+    )
+    plotly_chart_cached(
+        build_high_res_time_series_fig,
+        df_window,
+        width_px=width_px,
+        method=method,
+        height=height,
+    )
@@ -1,11 +1,17 @@
 import streamlit as st
 
+from data.partitioned_store import available_years, store_exists
+from utils.constants import DEFAULT_YEAR
+
+
 def init_state():
     if "year" not in st.session_state:
-        st.session_state.year = 2025
+        # latest year of the partitioned store, the bundled CSV only covers DEFAULT_YEAR
+        years = available_years() if store_exists() else []
+        st.session_state.year = years[-1] if years else DEFAULT_YEAR
 
     if "energy_filter" not in st.session_state:
         st.session_state.energy_filter = "Alle"
 
 
-# Plots lesen nur: st.session_state.year
\ No newline at end of file
+# Plots lesen nur: st.session_state.year
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from data.production_data import columns_to_process, main
+
+HEADER = "Datum," + ",".join(columns_to_process) + "\n"
+
+
+def _row(date, value):
+    return date + "," + ",".join([str(value)] * len(columns_to_process))
+
+
+def _run(tmp_path, *args):
+    output = tmp_path / "monthly_sums.csv"
+    main(["--input", str(tmp_path / "cleaned.csv"), "--output", str(output),
+          "--state", str(tmp_path / "state.json"), *args])
+    return pd.read_csv(output, dtype={"Monat": str}).set_index("Monat")["Laufwerke"]
+
+
+def test_last_line_without_newline_is_read(tmp_path):
+    csv = tmp_path / "cleaned.csv"
+    csv.write_text(HEADER + _row("2024-07-01", 10.0) + "\n" + _row("2024-07-08", 5.5), encoding="utf-8")
+
+    assert _run(tmp_path, "--full")["07"] == 15.5
+    # unveränderte Datei: nichts doppelt zählen
+    assert _run(tmp_path)["07"] == 15.5
+
+
+def test_unterminated_line_held_back_while_growing(tmp_path):
+    csv = tmp_path / "cleaned.csv"
+    csv.write_text(HEADER + _row("2024-07-01", 10.0) + "\n", encoding="utf-8")
+    _run(tmp_path, "--full")
+
+    with csv.open("a", encoding="utf-8") as handle:
+        handle.write(_row("2024-07-08", 5.5))
+    # die Datei ist seit dem letzten Lauf gewachsen, die letzte Zeile kann unfertig sein
+    assert _run(tmp_path)["07"] == 10.0
+    # Grösse unverändert: jetzt gilt die Zeile als vollständig
+    assert _run(tmp_path)["07"] == 15.5
+
+    with csv.open("a", encoding="utf-8") as handle:
+        handle.write("\n" + _row("2024-08-01", 1.0) + "\n")
+    sums = _run(tmp_path)
+    assert (sums["07"], sums["08"]) == (15.5, 1.0)
@@ -1,2 +1,3 @@
 UNIT_GWH = "GWh"
 MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug"]
+DEFAULT_YEAR = 2025
@@ -0,0 +1,75 @@
+"""Downsampling of long time series for plotting.
+
+Both methods return indices into the input, so the kept points are real
+measurements and several series can share the same timestamps.
+"""
+import numpy as np
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype("int64").astype("float64")
+    return x.astype("float64")
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: `n_out` points that keep the visual shape of (x, y)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.asarray(y, dtype="float64")
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
+
+
+def minmax_indices(y, n_buckets):
+    """Minimum and maximum of each of `n_buckets` equal buckets, so peaks are never lost."""
+    n = len(y)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        kept.extend((start + int(np.argmin(bucket)), start + int(np.argmax(bucket))))
+
+    return np.unique(kept)
+
+
+def downsample(x, y, n_out, method="lttb"):
+    """(x, y) reduced to about `n_out` points, NaN values are dropped first."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype="float64")
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+
+    if method == "minmax":
+        kept = minmax_indices(y, max(n_out // 2, 1))
+    else:
+        kept = lttb_indices(x, y, n_out)
+    return x[kept], y[kept]
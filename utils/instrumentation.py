@@ -0,0 +1,151 @@
+"""Opt-in timing of the dashboard cards.
+
+Enable with DASHBOARD_TIMING=1. Each card run records its data-prep time,
+figure-build time, payload size and cache hits / misses. Records are appended
+to a JSON lines log, summed up in a Prometheus text file and shown in the
+debug panel. Disabled, every hook is a no-op.
+
+    with card_timer("map"):            # or @card_timer("map") on the card function
+        with timed("prep", cached=True):
+            cube = _load_cube(...)     # cache_miss() inside the cached function
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+ENABLED = os.environ.get("DASHBOARD_TIMING", "") not in ("", "0")
+LOG_PATH = Path(os.environ.get("DASHBOARD_TIMING_LOG", "logs/card_timings.jsonl"))
+METRICS_PATH = Path(os.environ.get("DASHBOARD_METRICS_FILE", "logs/dashboard_metrics.prom"))
+
+PHASES = ("prep", "build")
+COUNTERS = ("prep_s", "build_s", "total_s", "payload_bytes", "cache_hits", "cache_misses")
+
+_current = ContextVar("card_record", default=None)
+_lock = threading.Lock()
+_totals = {}
+recent = deque(maxlen=500)
+
+
+@contextmanager
+def card_timer(card):
+    """Collect everything measured inside the block into one record of `card`."""
+    if not ENABLED:
+        yield None
+        return
+
+    record = {"card": card, **{name: 0 for name in COUNTERS}, "_stack": []}
+    token = _current.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["total_s"] = time.perf_counter() - start
+        _current.reset(token)
+        del record["_stack"]
+        record["time"] = time.time()
+        _publish(record)
+
+
+@contextmanager
+def timed(phase, cached=False):
+    """
+    Add the time of the block to `phase` of the current card. Nested phases
+    are subtracted from the outer one. With cached=True the block counts as a
+    cache hit unless cache_miss() was called inside it.
+    """
+    record = _current.get()
+    if record is None:
+        yield
+        return
+
+    misses = record["cache_misses"]
+    frame = [phase, time.perf_counter(), 0.0]
+    record["_stack"].append(frame)
+    try:
+        yield
+    finally:
+        record["_stack"].pop()
+        elapsed = time.perf_counter() - frame[1]
+        record[f"{phase}_s"] += elapsed - frame[2]
+        if record["_stack"]:
+            record["_stack"][-1][2] += elapsed
+        if cached and record["cache_misses"] == misses:
+            record["cache_hits"] += 1
+
+
+def cache_miss():
+    """Call from the body of a cached function, it only runs on a miss."""
+    record = _current.get()
+    if record is not None:
+        record["cache_misses"] += 1
+
+
+def cache_hit():
+    record = _current.get()
+    if record is not None:
+        record["cache_hits"] += 1
+
+
+def add_payload(size):
+    """Bytes sent to the browser for the current card."""
+    record = _current.get()
+    if record is not None:
+        record["payload_bytes"] += size
+
+
+def _publish(record):
+    with _lock:
+        recent.append(record)
+        totals = _totals.setdefault(record["card"], {"runs": 0, **{name: 0 for name in COUNTERS}})
+        totals["runs"] += 1
+        for name in COUNTERS:
+            totals[name] += record[name]
+
+        try:
+            LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with LOG_PATH.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+            write_prometheus(METRICS_PATH)
+        except OSError:
+            # read-only deployments still get the debug panel
+            pass
+
+
+def prometheus_text():
+    """Totals since start in the Prometheus text exposition format."""
+    lines = [
+        "# HELP dashboard_card_runs_total Card runs since start.",
+        "# TYPE dashboard_card_runs_total counter",
+    ]
+    lines += [f'dashboard_card_runs_total{{card="{card}"}} {t["runs"]}' for card, t in sorted(_totals.items())]
+
+    lines += [
+        "# HELP dashboard_card_seconds_total Time spent per card and phase.",
+        "# TYPE dashboard_card_seconds_total counter",
+    ]
+    for card, t in sorted(_totals.items()):
+        for phase in PHASES + ("total",):
+            lines.append(f'dashboard_card_seconds_total{{card="{card}",phase="{phase}"}} {t[f"{phase}_s"]:.6f}')
+
+    for name, help_text in (
+        ("payload_bytes", "Bytes sent to the browser per card."),
+        ("cache_hits", "Cache hits per card."),
+        ("cache_misses", "Cache misses per card."),
+    ):
+        lines += [f"# HELP dashboard_{name}_total {help_text}", f"# TYPE dashboard_{name}_total counter"]
+        lines += [f'dashboard_{name}_total{{card="{card}"}} {t[name]}' for card, t in sorted(_totals.items())]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=METRICS_PATH):
+    # written to a temporary file first, so a scraper never reads half a file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(prometheus_text(), encoding="utf-8")
+    tmp.replace(path)
@@ -0,0 +1,95 @@
+"""Scatter statistics: quantile outliers and trend fits for an (x, y) pair.
+
+Everything a scatter panel needs is computed in one pass and cached per
+(data version, columns, parameters), so several panels on the same data
+share the work.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from data.load_data import frame_version
+
+_MAX_ENTRIES = 64
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+
+def theil_sen(x, y, max_points=2_000, seed=0):
+    """Robust line fit (median of pairwise slopes), on a random subset for large inputs."""
+    if len(x) > max_points:
+        pick = np.random.default_rng(seed).choice(len(x), max_points, replace=False)
+        x, y = x[pick], y[pick]
+    i, j = np.triu_indices(len(x), k=1)
+    dx = x[j] - x[i]
+    valid = dx != 0
+    slope = np.median((y[j] - y[i])[valid] / dx[valid])
+    intercept = np.median(y - slope * x)
+    return np.array([slope, intercept])
+
+
+def compute_scatter_stats(x, y, upper_q=None, lower_q=None, trend_points=50, robust=False):
+    """
+    Outliers above the `upper_q` / below the `lower_q` quantile of y, a linear
+    trend (least squares, or Theil-Sen with robust=True) and the split arrays.
+    NaN pairs are ignored.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+
+    outlier = np.zeros(len(y), dtype=bool)
+    thresholds = {}
+    if len(y):
+        if upper_q is not None:
+            thresholds["upper"] = np.quantile(y, upper_q)
+            outlier |= y > thresholds["upper"]
+        if lower_q is not None:
+            thresholds["lower"] = np.quantile(y, lower_q)
+            outlier |= y < thresholds["lower"]
+
+    if len(x) >= 2:
+        coef = theil_sen(x, y) if robust else np.polyfit(x, y, 1)
+        trend_x = np.linspace(x.min(), x.max(), trend_points)
+        trend_y = np.polyval(coef, trend_x)
+    else:
+        coef = np.array([np.nan, np.nan])
+        trend_x = trend_y = np.array([])
+
+    return {
+        "x_inliers": x[~outlier],
+        "y_inliers": y[~outlier],
+        "x_outliers": x[outlier],
+        "y_outliers": y[outlier],
+        "outlier_index": np.flatnonzero(valid)[outlier],
+        "thresholds": thresholds,
+        "coef": coef,
+        "trend_x": trend_x,
+        "trend_y": trend_y,
+    }
+
+
+def get_scatter_stats(df, x_col, y_col, upper_q=None, lower_q=None, trend_points=50, robust=False):
+    """Cached compute_scatter_stats() for two columns of `df`. The arrays are shared, do not modify them."""
+    key = (frame_version(df), x_col, y_col, upper_q, lower_q, trend_points, robust)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    result = compute_scatter_stats(
+        df[x_col].to_numpy(), df[y_col].to_numpy(),
+        upper_q=upper_q, lower_q=lower_q, trend_points=trend_points, robust=robust,
+    )
+    with _lock:
+        _cache[key] = result
+        if len(_cache) > _MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return result
+
+
+def clear():
+    with _lock:
+        _cache.clear()